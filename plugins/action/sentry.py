@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+from importlib import import_module
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi, SentryApiError
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_session import default_transport, get_session
+
+
+class ActionModule(ActionBase):
+    """
+    Runs the Sentry modules inside the controller process. The modules only talk
+    to the Sentry HTTP API, so shipping them with AnsiballZ and starting a new
+    interpreter for every task is pure overhead. Set the variable
+    sentry_run_on_controller to false to execute them as regular modules instead.
+    """
+
+    TRANSFERS_FILES = False
+    _supports_check_mode = True
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = task_vars or dict()
+
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        if not boolean(task_vars.get('sentry_run_on_controller', True), strict=False):
+            result.update(self._execute_module(task_vars=task_vars))
+            return result
+
+        module_name = self._task.action.rpartition('.')[2]
+        module = import_module('ansible_collections.ridwanbejo.sentry.plugins.modules.%s' % module_name)
+
+        validation = ArgumentSpecValidator(module.argument_spec()).validate(self._task.args)
+
+        if validation.error_messages:
+            result.update(failed=True, msg=", ".join(validation.error_messages))
+            return result
+
+        params = validation.validated_parameters
+        socket_path = self._connection.socket_path
+        session = None
+
+        # on the controller the pooled requests transport is preferred when
+        # available, its import cost is paid once per worker process
+        transport = default_transport(params['transport'])
+
+        try:
+            if not socket_path and transport == 'requests':
+                session = get_session(params['sentry_host'], params.get('concurrency') or SentryApi.POOL_SIZE)
+
+            sentry_api = SentryApi.from_params(params, session=session, socket_path=socket_path, check_mode=self._task.check_mode)
+        except SentryApiError as e:
+            result.update(failed=True, msg=str(e))
+            return result
+
+        try:
+            result.update(sentry_api.shape_result(module.run_task(sentry_api, params)))
+        except SentryApiError as e:
+            result.update(sentry_api.error_result(e))
+
+        return result
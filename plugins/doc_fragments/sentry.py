@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # Options shared by every module to tune how Sentry API is called
+    DOCUMENTATION = r"""
+notes:
+  - Since 1.1.0 the modules run on the Ansible controller through the collection's action plugin, whatever host the play targets, so Sentry is called from the controller. Before, they ran on the target host like any module
+  - Set the variable C(sentry_run_on_controller=false) (for example in the inventory, or in the C(vars) of a play or task) to run them on the target host again, which is needed when Sentry is only reachable from there
+  - In check mode only reads are sent to Sentry. The result reports the planned C(operation) (create, update or delete), the payload it would send and a per-field C(diff), shown with C(--diff)
+options:
+  retries:
+    description:
+    - Number of times a call is retried when Sentry answers 429 or 5xx, or when the connection fails
+    - Waits follow C(Retry-After) and C(X-Sentry-Rate-Limit-Reset) when Sentry sends them, otherwise a jittered exponential backoff
+    - A create call is only retried after checking that the object was not created by the failed attempt
+    type: int
+    default: 3
+    version_added: 1.1.0
+  retry_backoff:
+    description:
+    - Base delay in seconds of the exponential backoff between retries
+    type: float
+    default: 1.0
+    version_added: 1.1.0
+  rate_limit:
+    description:
+    - Maximum number of requests per second sent to I(sentry_host) by all the tasks running on the same machine, e.g. every fork of a play delegated to localhost
+    - The forks share a token bucket stored in a lock-protected file under the system temporary directory, the task fails when that file can't be written, e.g. when another user owns it
+    - Not set by default, which means no client side limit
+    type: float
+    version_added: 1.1.0
+  rate_limit_burst:
+    description:
+    - Number of requests allowed at once above I(rate_limit) after an idle period
+    - Defaults to I(rate_limit)
+    type: int
+    version_added: 1.1.0
+  connect_timeout:
+    description:
+    - Seconds to wait for the connection to Sentry to be established
+    - With I(transport=open_url) a single socket timeout is used, I(read_timeout) then also bounds the connection
+    type: float
+    default: 10
+    version_added: 1.1.0
+  read_timeout:
+    description:
+    - Seconds to wait for Sentry to send data once connected
+    type: float
+    default: 30
+    version_added: 1.1.0
+  task_timeout:
+    description:
+    - Overall budget in seconds of the task, covering every call it makes (for example retrieve then update) with their retries
+    - When it runs out the task fails right away and reports C(timing) with the elapsed time, the number of requests and retries
+    - Not set by default, which means only I(connect_timeout) and I(read_timeout) apply
+    type: float
+    version_added: 1.1.0
+  cache_ttl:
+    description:
+    - Seconds during which organization, team and project reads are served from a cache shared by every task running on the same machine, e.g. all the forks of a play on the controller
+    - Any change made through the collection to an object drops its cached copy, changes made elsewhere (Sentry UI, other tools) may stay unseen until the entry expires
+    - Not set by default, which means every read goes to Sentry
+    type: float
+    version_added: 1.1.0
+  cache_dir:
+    description:
+    - Directory of the response cache, entries are stored one file per URL
+    - Defaults to C(ansible-sentry-cache) under the system temporary directory
+    type: path
+    version_added: 1.1.0
+  transport:
+    description:
+    - HTTP client used to call Sentry
+    - C(open_url) is Ansible's built-in client, it needs no extra Python library but opens a new connection for every call
+    - C(requests) keeps a pool of keep-alive connections, it needs the requests Python library
+    - Defaults to C(requests) when the task runs on the controller through the collection's action plugin and requests is installed, C(open_url) otherwise
+    - Ignored when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    choices: ['open_url', 'requests']
+    version_added: 1.1.0
+  return_fields:
+    description:
+    - Only keep these fields of the Sentry responses returned in C(response), as dot-separated key paths such as C(slug) or C(team.slug)
+    - Applies to every result of the bulk modules and to the follow-up update under C(then) too. A Sentry project alone carries its features, plugins and options, keeping a few fields makes registered results and the callback output much smaller in large loops
+    - Not set by default, which means whole responses are returned
+    type: list
+    elements: str
+    version_added: 1.1.0
+  result_mode:
+    description:
+    - C(full) returns the responses of Sentry and the payloads sent, reduced to I(return_fields) when set
+    - C(minimal) returns neither, only C(changed), C(operation), C(message), C(url), C(status_code) and the C(diff)
+    type: str
+    default: full
+    choices: ['full', 'minimal']
+    version_added: 1.1.0
+  metrics:
+    description:
+    - Return every HTTP call of the task in C(metrics), with its C(method), API path template (C(url)), C(status_code), C(ttfb) (seconds until Sentry answered), C(total) seconds, C(bytes_in), C(bytes_out) and C(retry) number
+    - With I(metrics) or I(trace_file) set, and for every failed task, the result also carries C(timing), which splits the task duration into C(http), C(waiting) (retry backoff and rate limits) and C(overhead), the time spent in the collection and Ansible
+    type: bool
+    default: false
+    version_added: 1.1.0
+  trace_file:
+    description:
+    - Also append every HTTP call, as described for I(metrics), to this file as one JSON line with the C(time) it started and the C(pid) of the process
+    - Lines are written as the calls happen, so the trace of a task that hangs or gets killed is kept. Every fork of a play can append to the same file
+    type: path
+    version_added: 1.1.0
+"""
+
+    # Desired state of an organization, planned by sentry_plan and converged by sentry_org_state
+    DESIRED_STATE = r"""
+options:
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+    version_added: 1.1.0
+  teams:
+    description:
+    - Desired teams, matched by slug
+    type: list
+    elements: dict
+    default: []
+    version_added: 1.1.0
+    suboptions:
+      team_slug:
+        description:
+        - slug of the existing team. Defaults to I(slug)
+        type: str
+      name:
+        description:
+        - name for the team
+        type: str
+      slug:
+        description:
+        - slug for the team
+        type: str
+      state:
+        description:
+        - Whether the team should exist or not
+        default: 'present'
+        choices: ['present', 'absent']
+        type: str
+  projects:
+    description:
+    - Desired projects, matched by slug. Each item accepts the same options as the items of M(ridwanbejo.sentry.sentry_projects)
+    type: list
+    elements: dict
+    default: []
+    version_added: 1.1.0
+    suboptions:
+      project_slug:
+        description:
+        - slug of the existing project. Defaults to I(slug)
+        type: str
+      team_slug:
+        description:
+        - slug of the team which owns the project. Required to create a project
+        type: str
+      name:
+        description:
+        - name for the project
+        type: str
+      slug:
+        description:
+        - slug for the project
+        type: str
+      platform:
+        description:
+        - Platform for the project
+        type: str
+      is_bookmarked:
+        description:
+        - Bookmark the project
+        type: bool
+      state:
+        description:
+        - Whether the project should exist or not
+        default: 'present'
+        choices: ['present', 'absent']
+        type: str
+  client_keys:
+    description:
+    - Desired client keys, matched by name within their project
+    type: list
+    elements: dict
+    default: []
+    version_added: 1.1.0
+    suboptions:
+      project_slug:
+        description:
+        - slug of the project, after any rename done by I(projects)
+        type: str
+        required: true
+      name:
+        description:
+        - name of the client key
+        type: str
+        required: true
+      is_active:
+        description:
+        - Activate or deactivate the client key
+        type: bool
+      state:
+        description:
+        - Whether the client key should exist or not
+        default: 'present'
+        choices: ['present', 'absent']
+        type: str
+  service_hooks:
+    description:
+    - Desired service hooks, matched by url within their project
+    type: list
+    elements: dict
+    default: []
+    version_added: 1.1.0
+    suboptions:
+      project_slug:
+        description:
+        - slug of the project, after any rename done by I(projects)
+        type: str
+        required: true
+      url:
+        description:
+        - URL called by the hook
+        type: str
+        required: true
+      events:
+        description:
+        - Events sent to the hook, for example C(event.alert) or C(event.created)
+        type: list
+        elements: str
+      state:
+        description:
+        - Whether the service hook should exist or not
+        default: 'present'
+        choices: ['present', 'absent']
+        type: str
+  concurrency:
+    description:
+    - Maximum number of Sentry calls made at the same time when listing or writing
+    type: int
+    default: 8
+    version_added: 1.1.0
+"""
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+DOCUMENTATION = r"""
+name: sentry
+short_description: HttpApi plugin for Sentry API
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Keeps one persistent connection process to Sentry for the whole play, shared by every task of the ridwanbejo.sentry collection
+  - Authentication is set up once when the connection starts, the modules then no longer need I(sentry_host) and I(sentry_token)
+  - Use it with C(ansible_connection=ansible.netcommon.httpapi), C(ansible_network_os=ridwanbejo.sentry.sentry), C(ansible_host) set to the Sentry host and C(ansible_httpapi_use_ssl) / C(ansible_httpapi_port) as needed
+version_added: 1.1.0
+options:
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Defaults to the connection password (C(ansible_httpapi_pass))
+    type: str
+    vars:
+    - name: ansible_httpapi_sentry_token
+"""
+
+from ansible.module_utils.common.text.converters import to_text
+
+from ansible_collections.ansible.netcommon.plugins.plugin_utils.httpapi_base import HttpApiBase
+
+
+class HttpApi(HttpApiBase):
+
+    def login(self, username, password):
+        token = self.get_option('sentry_token') or password
+
+        if token:
+            self.connection._auth = {'Authorization': 'Bearer %s' % token}
+
+    def handle_httperror(self, exc):
+        # 404 on a retrieve, 429 when throttled... are answers for SentryApi to
+        # interpret, not connection failures. Hand the response back as is.
+        return exc
+
+    def send_request(self, data, method='GET', path='/', headers=None):
+        response, response_data = self.connection.send(path, data, method=method, headers=headers or {})
+
+        return dict(
+            status_code=response.getcode(),
+            headers=dict(response.headers.items()),
+            body=to_text(response_data.read())
+        )
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+DOCUMENTATION = r"""
+name: sentry
+short_description: Sentry projects as inventory hosts
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Every project of a Sentry organization becomes a host named after its slug, in the groups C(sentry_team_<team>) of each of its teams and C(sentry_platform_<platform>)
+  - Without I(teams) the organization's listing of its projects gives the hosts and their teams. With I(teams) the listings of those teams run concurrently instead. The pages of each listing follow one another as Sentry's cursors require
+  - With I(cache) enabled the inventory is read from Ansible's inventory cache until I(cache_timeout) expires, instead of listing the organization on every run
+  - The configuration file name must end with C(sentry.yml) or C(sentry.yaml)
+version_added: 1.1.0
+extends_documentation_fragment:
+  - constructed
+  - inventory_cache
+options:
+  plugin:
+    description:
+    - Token that ensures this is a source file for the plugin
+    required: true
+    choices: ['ridwanbejo.sentry.sentry']
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    type: str
+    required: true
+    env:
+    - name: SENTRY_HOST
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    type: str
+    required: true
+    env:
+    - name: SENTRY_TOKEN
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+  teams:
+    description:
+    - Only list the projects of these teams
+    - Defaults to every project of the organization
+    type: list
+    elements: str
+    default: []
+  concurrency:
+    description:
+    - Maximum number of listings running at the same time
+    type: int
+    default: 8
+  transport:
+    description:
+    - HTTP client used to call Sentry
+    - Defaults to C(requests) when the requests Python library is installed, C(open_url) otherwise
+    type: str
+    choices: ['open_url', 'requests']
+"""
+
+EXAMPLES = r"""
+# sentry.yml, every project of the organization, cached for an hour
+plugin: ridwanbejo.sentry.sentry
+sentry_host: "http://localhost:9000"
+organization_slug: 'sentry'
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /tmp/sentry-inventory
+cache_timeout: 3600
+compose:
+  ansible_connection: "'local'"
+
+# backend-sentry.yml, the projects of two teams with a group per bookmark state
+plugin: ridwanbejo.sentry.sentry
+sentry_host: "http://localhost:9000"
+organization_slug: 'sentry'
+teams:
+- backend
+- platform-team
+keyed_groups:
+- key: sentry_project.isBookmarked
+  prefix: bookmarked
+"""
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import to_safe_group_name
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi, SentryApiError, sentry_default_params
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_session import default_transport
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'ridwanbejo.sentry.sentry'
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and path.endswith(('sentry.yml', 'sentry.yaml'))
+
+    def fetch_projects(self):
+        # projects by slug, each with the slugs of its teams, only the listed ones with teams
+        params = sentry_default_params(
+            sentry_host=self.get_option('sentry_host'),
+            sentry_token=self.get_option('sentry_token'),
+            concurrency=self.get_option('concurrency'),
+            transport=default_transport(self.get_option('transport'))
+        )
+        organization_slug = self.get_option('organization_slug')
+
+        try:
+            sentry_api = SentryApi.from_params(params)
+        except SentryApiError as e:
+            raise AnsibleParserError(str(e))
+
+        team_slugs = self.get_option('teams')
+
+        # without teams the organization listing is enough, it carries the teams of
+        # every project and also brings the projects which have no team
+        def worker(team_slug):
+            if team_slug is None:
+                return dict(projects=list(sentry_api.iter_projects(organization_slug)))
+
+            return dict(projects=list(sentry_api.iter_team_projects(organization_slug, team_slug)))
+
+        listings = list(team_slugs) or [None]
+
+        try:
+            results = run_concurrently(worker, listings, params['concurrency'])
+        finally:
+            sentry_api.close()
+
+        projects = {}
+
+        for team_slug, result in zip(listings, results):
+            if result.get('failed'):
+                raise AnsibleParserError("Failed to list the projects of %s: %s" % (team_slug or organization_slug, result['message']))
+
+            for project in result['projects']:
+                project = projects.setdefault(project['slug'], dict(project, sentry_teams=[]))
+
+                if team_slug is not None:
+                    project['sentry_teams'].append(team_slug)
+                else:
+                    project['sentry_teams'].extend(SentryApi.project_team_slugs(project))
+
+        return projects
+
+    def populate(self, projects):
+        strict = self.get_option('strict')
+        organization_slug = self.get_option('organization_slug')
+
+        for project_slug, project in sorted(projects.items()):
+            self.inventory.add_host(project_slug)
+
+            # the projects may be the cached copy, they are only read
+            teams = project['sentry_teams']
+            hostvars = dict(
+                sentry_organization_slug=organization_slug,
+                sentry_project_slug=project_slug,
+                sentry_project_name=project.get('name'),
+                sentry_platform=project.get('platform'),
+                sentry_teams=teams,
+                sentry_project=dict((name, value) for name, value in project.items() if name != 'sentry_teams')
+            )
+
+            for name, value in hostvars.items():
+                self.inventory.set_variable(project_slug, name, value)
+
+            for team_slug in teams:
+                self.inventory.add_child(self.inventory.add_group(to_safe_group_name('sentry_team_%s' % team_slug)), project_slug)
+
+            if project.get('platform'):
+                self.inventory.add_child(self.inventory.add_group(to_safe_group_name('sentry_platform_%s' % project['platform'])), project_slug)
+
+            self._set_composite_vars(self.get_option('compose'), hostvars, project_slug, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), hostvars, project_slug, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, project_slug, strict=strict)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path)
+
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        projects = None
+
+        if attempt_to_read_cache:
+            try:
+                projects = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if not attempt_to_read_cache or cache_needs_update:
+            projects = self.fetch_projects()
+
+        if cache_needs_update:
+            self._cache[cache_key] = projects
+
+        self.populate(projects)
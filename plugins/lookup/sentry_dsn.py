@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+DOCUMENTATION = r"""
+name: sentry_dsn
+short_description: Look up the DSN of Sentry projects
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Returns the public DSN of the client key of every given project, in the same order
+  - The keys of all the projects of one lookup which are not known yet are listed concurrently
+  - Listings are remembered by the worker process, so the items of a loop or the many references of a template cost one listing per project
+  - With I(cache_ttl) set they are also stored in the collection's response cache, shared by every fork of the play, so the following tasks don't list them again
+version_added: 1.1.0
+options:
+  _terms:
+    description:
+    - Slugs of the projects
+    required: true
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    type: str
+    required: true
+    env:
+    - name: SENTRY_HOST
+    vars:
+    - name: sentry_host
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    type: str
+    required: true
+    env:
+    - name: SENTRY_TOKEN
+    vars:
+    - name: sentry_token
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+  key_name:
+    description:
+    - Name of the client key whose DSN is returned, for example the name given to M(ridwanbejo.sentry.sentry_client_key_rotate)
+    - Defaults to the first active key of the project
+    type: str
+  cache_ttl:
+    description:
+    - Seconds during which the listings are shared through the response cache with the other tasks of the play, the cache outlives the play
+    - A key created, updated or deleted by a task of the collection with I(cache_ttl) set drops the listing of its project, other changes, key rotations without I(cache_ttl) included, stay unseen until the entry expires
+    - Defaults to C(0), the listings are only remembered within the worker process
+    type: float
+    default: 0
+  cache_dir:
+    description:
+    - Directory of the response cache
+    - Defaults to C(ansible-sentry-cache) under the system temporary directory
+    type: path
+  concurrency:
+    description:
+    - Maximum number of projects listed at the same time
+    type: int
+    default: 8
+  transport:
+    description:
+    - HTTP client used to call Sentry
+    - Defaults to C(requests) when the requests Python library is installed, C(open_url) otherwise
+    type: str
+    choices: ['open_url', 'requests']
+"""
+
+EXAMPLES = r"""
+- name: Render the application config with the DSN of its project
+  ansible.builtin.template:
+    src: app.conf.j2
+    dest: /etc/app/app.conf
+  vars:
+    sentry_dsn: "{{ lookup('ridwanbejo.sentry.sentry_dsn', 'selamat-pagi', organization_slug='sentry') }}"
+
+- name: DSN of many projects at once, listed concurrently
+  ansible.builtin.debug:
+    msg: "{{ query('ridwanbejo.sentry.sentry_dsn', 'selamat-pagi', 'selamat-sore', organization_slug='sentry', key_name='rotation-2022-q3') }}"
+"""
+
+RETURN = r"""
+_raw:
+  description: Public DSN of every project, in the order of the terms
+  type: list
+  elements: str
+"""
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi, SentryApiError, sentry_default_params
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_session import default_transport, get_session
+
+
+# Client key listings already fetched by this worker process, by host, token,
+# organization and project
+CLIENT_KEYS = {}
+
+
+def select_dsn(client_keys, key_name):
+    for client_key in client_keys:
+        if key_name is not None and client_key['name'] != key_name:
+            continue
+
+        if key_name is None and not client_key['is_active']:
+            continue
+
+        return client_key['dsn']
+
+    return None
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        params = sentry_default_params(
+            sentry_host=self.get_option('sentry_host'),
+            sentry_token=self.get_option('sentry_token'),
+            cache_ttl=self.get_option('cache_ttl'),
+            cache_dir=self.get_option('cache_dir'),
+            concurrency=self.get_option('concurrency'),
+            transport=default_transport(self.get_option('transport'))
+        )
+        organization_slug = self.get_option('organization_slug')
+        key_name = self.get_option('key_name')
+
+        def memo_key(project_slug):
+            return (params['sentry_host'], params['sentry_token'], organization_slug, project_slug)
+
+        missing = [project_slug for project_slug in set(terms) if memo_key(project_slug) not in CLIENT_KEYS]
+
+        if missing:
+            try:
+                session = None
+                if params['transport'] == 'requests':
+                    session = get_session(params['sentry_host'], params['concurrency'])
+
+                sentry_api = SentryApi.from_params(params, session=session)
+            except SentryApiError as e:
+                raise AnsibleLookupError(str(e))
+
+            def worker(project_slug):
+                return dict(client_keys=sentry_api.client_key_dsns(organization_slug, project_slug))
+
+            for project_slug, result in zip(missing, run_concurrently(worker, missing, params['concurrency'])):
+                if result.get('failed'):
+                    raise AnsibleLookupError("Failed to list the client keys of %s: %s" % (project_slug, result['message']))
+
+                CLIENT_KEYS[memo_key(project_slug)] = result['client_keys']
+
+        dsns = []
+
+        for project_slug in terms:
+            dsn = select_dsn(CLIENT_KEYS[memo_key(project_slug)], key_name)
+
+            if dsn is None:
+                raise AnsibleLookupError(
+                    "Project %s has no %s" % (project_slug, "client key named %s" % key_name if key_name else "active client key")
+                )
+
+            dsns.append(dsn)
+
+        return dsns
@@ -1,7 +1,66 @@
 #!/usr/bin/python
 
-import requests
 import json
+import os
+import random
+import re
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from ansible.module_utils.connection import Connection
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_cache import ResponseCache
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_ratelimit import HostRateLimiter
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_transport import (
+	SentryTransportError, SentryResponse, OpenUrlSession, RequestsSession, HttpApiSession
+)
+
+
+def sentry_argument_spec():
+	# options shared by every module, documented in the ridwanbejo.sentry.sentry doc fragment
+	return dict(
+		retries=dict(type='int', default=SentryApi.RETRIES),
+		retry_backoff=dict(type='float', default=SentryApi.RETRY_BACKOFF),
+		rate_limit=dict(type='float', required=False),
+		rate_limit_burst=dict(type='int', required=False),
+		connect_timeout=dict(type='float', default=SentryApi.CONNECT_TIMEOUT),
+		read_timeout=dict(type='float', default=SentryApi.READ_TIMEOUT),
+		task_timeout=dict(type='float', required=False),
+		cache_ttl=dict(type='float', required=False),
+		cache_dir=dict(type='path', required=False),
+		transport=dict(type='str', required=False, choices=['open_url', 'requests']),
+		return_fields=dict(type='list', elements='str', required=False),
+		result_mode=dict(type='str', default=SentryApi.RESULT_MODE, choices=['full', 'minimal']),
+		metrics=dict(type='bool', default=False),
+		trace_file=dict(type='path', required=False)
+	)
+
+
+def sentry_default_params(**params):
+	# the shared options with their defaults, for the plugins which build a client
+	# without argument spec validation (lookup, inventory)
+	defaults = dict((name, spec.get('default')) for name, spec in sentry_argument_spec().items())
+	defaults.update(params)
+
+	return defaults
+
+
+class SentryApiError(Exception):
+	def __init__(self, message, url=None, status_code=None, response=None):
+		super(SentryApiError, self).__init__(message)
+		self.url = url
+		self.status_code = status_code
+		self.response = response
+
+	@classmethod
+	def from_result(cls, message, result):
+		return cls(message, url=result.get('url'), status_code=result.get('status_code'), response=result.get('response'))
+
+
+class SentryApiDeadlineExceeded(SentryApiError):
+	pass
 
 
 class SentryApi(object):
@@ -26,119 +85,775 @@ class SentryApi(object):
 	UPDATE_SERVICE_HOOK_URL = "/api/0/projects/{organization_slug}/{project_slug}/hooks/{hook_id}/"
 	DELETE_SERVICE_HOOK_URL = "/api/0/projects/{organization_slug}/{project_slug}/hooks/{hook_id}/"
 
-	def __init__(self, module, host, token):
+	LIST_PROJECTS_URL = "/api/0/organizations/{organization_slug}/projects/"
+	LIST_TEAMS_URL = "/api/0/organizations/{organization_slug}/teams/"
+	LIST_CLIENT_KEYS_URL = "/api/0/projects/{organization_slug}/{project_slug}/keys/"
+	LIST_SERVICE_HOOKS_URL = "/api/0/projects/{organization_slug}/{project_slug}/hooks/"
+	LIST_TEAM_PROJECTS_URL = "/api/0/teams/{organization_slug}/{team_slug}/projects/"
+
+	URLS = {
+		'create-project': CREATE_PROJECT_URL,
+		'retrieve-project': RETRIEVE_PROJECT_URL,
+		'update-project': UPDATE_PROJECT_URL,
+		'delete-project': DELETE_PROJECT_URL,
+		'create-team': CREATE_TEAM_URL,
+		'retrieve-team': RETRIEVE_TEAM_URL,
+		'update-team': UPDATE_TEAM_URL,
+		'delete-team': DELETE_TEAM_URL,
+		'retrieve-organization': RETRIEVE_ORGANIZATION_URL,
+		'update-organization': UPDATE_ORGANIZATION_URL,
+		'create-client-key': CREATE_CLIENT_KEY_URL,
+		'update-client-key': UPDATE_CLIENT_KEY_URL,
+		'delete-client-key': DELETE_CLIENT_KEY_URL,
+		'create-service-hook': CREATE_SERVICE_HOOK_URL,
+		'update-service-hook': UPDATE_SERVICE_HOOK_URL,
+		'delete-service-hook': DELETE_SERVICE_HOOK_URL,
+		'list-projects': LIST_PROJECTS_URL,
+		'list-teams': LIST_TEAMS_URL,
+		'list-client-keys': LIST_CLIENT_KEYS_URL,
+		'list-service-hooks': LIST_SERVICE_HOOKS_URL,
+		'list-team-projects': LIST_TEAM_PROJECTS_URL
+	}
+
+	# API path template -> pattern matching the paths built from it, see url_template
+	URL_PATTERNS = dict(
+		(template, re.compile('^' + re.sub(r'\\{[a-z_]+\\}', '[^/]+', re.escape(template)) + '$'))
+		for template in set(URLS.values())
+	)
+
+	# one entry of a Link header, e.g. <url>; rel="next"; results="true"; cursor="0:100:0"
+	LINK_PATTERN = re.compile(r'<([^>]*)>([^<]*)')
+
+	# payload field -> path of the same value in the retrieve response, used to diff
+	# the desired state against the remote object
+	PROJECT_FIELDS = {
+		'name': 'name',
+		'slug': 'slug',
+		'team_slug': 'team.slug',
+		'platform': 'platform',
+		'isBookmarked': 'isBookmarked'
+	}
+	TEAM_FIELDS = {'name': 'name', 'slug': 'slug'}
+	ORGANIZATION_FIELDS = {'name': 'name', 'slug': 'slug'}
+	CLIENT_KEY_FIELDS = {'name': 'name', 'isActive': 'isActive'}
+	SERVICE_HOOK_FIELDS = {'url': 'url', 'events': 'events'}
+	# Size of the keep-alive connection pool kept per Sentry host, see create_session
+	# Size of the keep-alive connection pool kept per Sentry host
+	POOL_SIZE = 10
+
+	# retry budget of a single call, delays grow as retry_backoff * 2 ** attempt
+	# with full jitter and never exceed RETRY_MAX_DELAY seconds
+	RETRIES = 3
+	RETRY_BACKOFF = 1.0
+	RETRY_MAX_DELAY = 60
+	RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+	# seconds to wait for the TCP/TLS connection and then for each read of the
+	# response, a stalled Sentry must not hang the fork forever
+	CONNECT_TIMEOUT = 10
+	READ_TIMEOUT = 30
+
+	# full keeps the whole response of every call in the task result, minimal drops it
+	RESULT_MODE = 'full'
+
+	# keys of a task result holding a Sentry object: the response, or the
+	# current object a result was compared with when no call returned one
+	RESULT_BODIES = ('response', 'current')
+
+	# keys of a task result holding the results of several calls
+	RESULT_LISTS = ('results', 'pruned')
+
+	# keys of a task result holding the result of a follow-up call
+	RESULT_NESTED = ('then',)
+
+	def __init__(self, module, host, token, session=None, retries=RETRIES, retry_backoff=RETRY_BACKOFF, rate_limiter=None,
+				connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, task_timeout=None, cache=None, check_mode=False,
+				return_fields=None, result_mode=RESULT_MODE, metrics=False, trace_file=None):
 		self.module = module
 		self.host = host
 
+		# task_timeout is the budget of the whole task (retrieve, update, retries and
+		# waits included), counted from the creation of the client
+		self.connect_timeout = connect_timeout
+		self.read_timeout = read_timeout
+		self.task_timeout = task_timeout
+		self.started = time.time()
+		self.deadline = self.started + task_timeout if task_timeout else None
+		self.request_count = 0
+
+		self.retries = retries
+		self.retry_backoff = retry_backoff
+		self.retry_count = 0
+		self.rate_limited_until = 0
+		self.rate_limiter = rate_limiter
+
+		# in check mode reads are sent but every write only reports what it would do
+		self.check_mode = check_mode
+
+		# optional ResponseCache of organization, team and project reads
+		self.cache = cache
+		self.cache_hits = 0
+
+		# how much of the Sentry responses the task result keeps, see shape_result
+		self.return_fields = return_fields
+		self.result_mode = result_mode
+
+		# seconds spent in HTTP calls and waiting (retries, rate limits), and with
+		# metrics or a trace_file the record of every call, see record_call
+		self.http_time = 0.0
+		self.wait_time = 0.0
+		self.calls = [] if metrics else None
+		self.trace_file = trace_file
+
 		self.headers = {
-			'Authorization': 'Bearer '+token, 
 			'Content-Type': 'application/json'
 		}
 
-		self.result = dict(
-			message=''
+		# over the httpapi connection the token is held by the connection itself
+		if token:
+			self.headers['Authorization'] = 'Bearer '+token
+
+		# all calls go through one transport, open_url unless the caller brings a
+		# pooled session (see create_session) or the httpapi connection
+		if session is None:
+			session = OpenUrlSession()
+
+		self.session = session
+		self.session.headers.update(self.headers)
+
+		# counters are shared by the threads using this client
+		self.lock = threading.Lock()
+
+	@classmethod
+	def from_module(cls, module, session=None):
+		try:
+			return cls.from_params(module.params, module=module, session=session, socket_path=module._socket_path, check_mode=module.check_mode)
+		except SentryApiError as e:
+			module.fail_json(msg=str(e))
+
+	@classmethod
+	def from_params(cls, params, module=None, session=None, socket_path=None, check_mode=False):
+		# build a client from validated module options, also used by the controller
+		# side action plugin which has no AnsibleModule. When the task runs over the
+		# httpapi connection, every call goes through its persistent socket
+		host = params['sentry_host']
+
+		if socket_path:
+			session = HttpApiSession(Connection(socket_path))
+			host = ''
+		elif not params['sentry_host'] or not params['sentry_token']:
+			raise SentryApiError("sentry_host and sentry_token are required unless the task runs over the ridwanbejo.sentry.sentry httpapi connection")
+		elif session is None and params['transport'] == 'requests':
+			session = cls.create_session(params.get('concurrency') or cls.POOL_SIZE)
+
+		rate_limiter = None
+		if params['rate_limit']:
+			rate_limiter = HostRateLimiter(
+				params['sentry_host'] or socket_path,
+				params['rate_limit'],
+				params['rate_limit_burst']
+			)
+
+		cache = None
+		if params['cache_ttl']:
+			cache = ResponseCache(
+				"%s %s" % (params['sentry_host'] or socket_path, params['sentry_token']),
+				params['cache_ttl'],
+				params['cache_dir']
+			)
+
+		return cls(
+			module,
+			host,
+			params['sentry_token'],
+			session=session,
+			retries=params['retries'],
+			retry_backoff=params['retry_backoff'],
+			rate_limiter=rate_limiter,
+			connect_timeout=params['connect_timeout'],
+			read_timeout=params['read_timeout'],
+			task_timeout=params['task_timeout'],
+			cache=cache,
+			check_mode=check_mode,
+			return_fields=params['return_fields'],
+			result_mode=params['result_mode'],
+			metrics=params['metrics'],
+			trace_file=params['trace_file']
 		)
 
+	@staticmethod
+	def create_session(pool_size=POOL_SIZE):
+		# pooled keep-alive connections, needs the requests library
+		try:
+			return RequestsSession(pool_size)
+		except ImportError:
+			raise SentryApiError("transport=requests needs the requests Python library")
+
+	def close(self):
+		self.session.close()
+
 	def build_url(self, url):
 		return self.host+url
 
-	def get_url(self, task):
-		if task == 'create-project':
-			return self.build_url(self.CREATE_PROJECT_URL.format(
-						organization_slug=self.organization_slug,
-						team_slug=self.team_slug
-					))
-		elif task == 'retrieve-project':
-			return self.build_url(self.RETRIEVE_PROJECT_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug
-					))
-		elif task == 'update-project':
-			return self.build_url(self.UPDATE_PROJECT_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug
-					))
-		elif task == 'delete-project':
-			return self.build_url(self.DELETE_PROJECT_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug
-					))
-		elif task == 'create-team':
-			return self.build_url(self.CREATE_TEAM_URL.format(
-						organization_slug=self.organization_slug
-					))
-		elif task == 'retrieve-team':
-			return self.build_url(self.RETRIEVE_TEAM_URL.format(
-						organization_slug=self.organization_slug,
-						team_slug=self.team_slug
-					))
-		elif task == 'update-team':
-			return self.build_url(self.UPDATE_TEAM_URL.format(
-						organization_slug=self.organization_slug,
-						team_slug=self.team_slug
-					))
-		elif task == 'delete-team':
-			return self.build_url(self.DELETE_TEAM_URL.format(
-						organization_slug=self.organization_slug,
-						team_slug=self.team_slug
-					))
-		elif task == 'retrieve-organization':
-			return self.build_url(self.RETRIEVE_ORGANIZATION_URL.format(
-						organization_slug=self.organization_slug
-					))
-		elif task == 'update-organization':
-			return self.build_url(self.UPDATE_ORGANIZATION_URL.format(
-						organization_slug=self.organization_slug
-					))
-		elif task == 'create-client-key':
-			return self.build_url(self.CREATE_CLIENT_KEY_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug
-					))
-		elif task == 'update-client-key':
-			return self.build_url(self.UPDATE_CLIENT_KEY_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug,
-						client_key=self.client_key
-					))
-		elif task == 'delete-client-key':
-			return self.build_url(self.DELETE_CLIENT_KEY_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug,
-						client_key=self.client_key
-					))
-		elif task == 'create-service-hook':
-			return self.build_url(self.CREATE_SERVICE_HOOK_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug
-					))
-		elif task == 'update-service-hook':
-			return self.build_url(self.UPDATE_SERVICE_HOOK_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug,
-						hook_id=self.hook_id
-					))
-		elif task == 'delete-service-hook':
-			return self.build_url(self.DELETE_SERVICE_HOOK_URL.format(
-						organization_slug=self.organization_slug,
-						project_slug=self.project_slug,
-						hook_id=self.hook_id
-					))
+	def backoff_delay(self, attempt):
+		return random.uniform(0, min(self.RETRY_MAX_DELAY, self.retry_backoff * (2 ** attempt)))
+
+	@staticmethod
+	def rate_limit_reset_delay(response):
+		reset = response.headers.get('X-Sentry-Rate-Limit-Reset')
+
+		try:
+			return max(0, float(reset) - time.time())
+		except (TypeError, ValueError):
+			return None
+
+	def retry_delay(self, response, attempt):
+		# prefer what Sentry tells us over our own guess
+		retry_after = response.headers.get('Retry-After')
+		delay = None
+
+		if retry_after:
+			try:
+				delay = float(retry_after)
+			except ValueError:
+				try:
+					delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+				except (TypeError, ValueError):
+					delay = None
+
+		if delay is None and response.status_code == 429:
+			delay = self.rate_limit_reset_delay(response)
+
+		if delay is None:
+			return self.backoff_delay(attempt)
+
+		# a little jitter so parallel forks do not come back at the same instant
+		return min(self.RETRY_MAX_DELAY, max(0, delay) + random.uniform(0, self.retry_backoff))
+
+	def record_rate_limit(self, response):
+		# when the quota is used up, hold the next call until the window resets
+		# instead of letting it bounce off a 429
+		if response.headers.get('X-Sentry-Rate-Limit-Remaining') == '0':
+			delay = self.rate_limit_reset_delay(response)
+
+			if delay:
+				self.rate_limited_until = time.time() + min(self.RETRY_MAX_DELAY, delay)
+
+	def timing(self):
+		elapsed = time.time() - self.started
+
+		# calls of the bulk modules overlap, their http time can exceed elapsed
+		return dict(
+			elapsed=round(elapsed, 3),
+			http=round(self.http_time, 3),
+			waiting=round(self.wait_time, 3),
+			overhead=round(max(0.0, elapsed - self.http_time - self.wait_time), 3),
+			task_timeout=self.task_timeout,
+			requests=self.request_count,
+			retries=self.retry_count,
+			cache_hits=self.cache_hits
+		)
+
+	def metrics(self):
+		# every call made by the task, or None unless the metrics option is set
+		if self.calls is None:
+			return None
+
+		with self.lock:
+			return list(self.calls)
+
+	@classmethod
+	def url_template(cls, url):
+		# the API path a call was built from, so calls to different objects add up
+		path = urlsplit(url).path
+
+		for template, pattern in cls.URL_PATTERNS.items():
+			if pattern.match(path):
+				return template
+
+		return path
+
+	def record_call(self, method, url, attempt, started, response=None, error=None, bytes_out=0):
+		total = time.time() - started
+
+		with self.lock:
+			self.http_time += total
+
+		if self.calls is None and not self.trace_file:
+			return
+
+		call = dict(
+			method=method,
+			url=self.url_template(url),
+			status_code=response.status_code if response is not None else None,
+			ttfb=round(response.ttfb, 4) if response is not None and response.ttfb is not None else None,
+			total=round(total, 4),
+			bytes_in=response.size if response is not None else None,
+			bytes_out=bytes_out,
+			retry=attempt
+		)
+
+		if error is not None:
+			call['error'] = error
+
+		with self.lock:
+			if self.calls is not None:
+				self.calls.append(call)
+
+			if self.trace_file:
+				# one JSON line per call, appended as it happens so a task that hangs
+				# or gets killed still leaves its trace. Every fork appends to the same
+				# file, each line carries when and by which process it was written.
+				try:
+					with open(self.trace_file, 'a') as trace_file:
+						trace_file.write(json.dumps(dict(call, time=round(started, 3), pid=os.getpid())) + '\n')
+				except (IOError, OSError):
+					pass
+
+	def remaining_time(self, method, url):
+		if self.deadline is None:
+			return None
+
+		remaining = self.deadline - time.time()
+
+		if remaining <= 0:
+			raise SentryApiDeadlineExceeded(
+				"Task timeout of %ss exceeded before %s %s" % (self.task_timeout, method, url),
+				url=url
+			)
+
+		return remaining
+
+	def wait(self, delay, reason):
+		# waiting past the deadline is pointless, fail right away instead
+		if self.deadline is not None and delay >= self.deadline - time.time():
+			raise SentryApiDeadlineExceeded(
+				"Task timeout of %ss would be exceeded waiting %.1fs %s" % (self.task_timeout, delay, reason)
+			)
+
+		time.sleep(delay)
+
+		with self.lock:
+			self.wait_time += delay
+
+	def sleep(self, delay, method, url, reason="to retry"):
+		# a wait before a call, the call is reported when it can't be made in time
+		try:
+			self.wait(delay, "%s %s %s" % (reason, method, url))
+		except SentryApiDeadlineExceeded as e:
+			e.url = url
+			raise
+
+	def wait_for_rate_limit(self, method, url):
+		delay = self.rate_limited_until - time.time()
+
+		if delay > 0:
+			self.sleep(delay, method, url)
+
+	def request(self, method, url, payload=None, verify=None, cache=False):
+		# GETs flagged cache are served from the response cache when enabled. Any
+		# other call changes the object behind url, so its cached copy is dropped
+		# before and after the call (a concurrent reader may have cached it again
+		# in between).
+		if self.cache is None:
+			return self.send(method, url, payload, verify)
+
+		if method == 'GET':
+			if cache:
+				body = self.cache.get(url)
+
+				if body is not None:
+					with self.lock:
+						self.cache_hits += 1
+					return SentryResponse(200, body)
+
+			response = self.send(method, url, payload, verify)
+
+			if cache and response.status_code == 200:
+				self.cache.set(url, response.json())
+
+			return response
+
+		self.cache.invalidate(url)
+
+		try:
+			return self.send(method, url, payload, verify)
+		finally:
+			self.cache.invalidate(url)
+
+	def send(self, method, url, payload=None, verify=None):
+		# Send one API call, retrying throttled (429), unavailable (5xx) and network
+		# failures within the retry budget. A POST is not idempotent: when it may
+		# have reached Sentry it is only retried after verify() found no trace of
+		# the object, and the object verify() found is returned otherwise.
+		data = json.dumps(payload) if payload is not None else None
+		attempt = 0
+
+		while True:
+			self.wait_for_rate_limit(method, url)
+
+			# the bucket is shared through a file, one another user owns can't be used
+			if self.rate_limiter is not None:
+				try:
+					self.rate_limiter.acquire(lambda wait: self.sleep(wait, method, url, "for the rate limit"))
+				except (IOError, OSError) as e:
+					raise SentryApiError(
+						"rate_limit can't use its state file %s, make it writable or remove it: %s" % (self.rate_limiter.state_path, e),
+						url=url
+					)
+
+			timeout = (self.connect_timeout, self.read_timeout)
+			remaining = self.remaining_time(method, url)
+
+			if remaining is not None:
+				timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+			started = time.time()
+
+			try:
+				with self.lock:
+					self.request_count += 1
+				response = self.session.request(method, url, data=data, timeout=timeout)
+			except SentryTransportError as e:
+				self.record_call(method, url, attempt, started, error=str(e), bytes_out=len(data.encode('utf-8')) if data else 0)
+				sent = e.sent
+
+				if attempt >= self.retries or (method == 'POST' and sent and verify is None):
+					raise SentryApiError("%s %s failed: %s" % (method, url, e), url=url)
+
+				if method == 'POST' and sent:
+					created = verify()
+					if created is not None:
+						return created
+
+				delay = self.backoff_delay(attempt)
+			else:
+				self.record_call(method, url, attempt, started, response=response, bytes_out=len(data.encode('utf-8')) if data else 0)
+				self.record_rate_limit(response)
+
+				if response.status_code not in self.RETRY_STATUS_CODES or attempt >= self.retries:
+					return response
+
+				if method == 'POST' and response.status_code != 429:
+					if verify is None:
+						return response
+
+					created = verify()
+					if created is not None:
+						return created
+
+				delay = self.retry_delay(response, attempt)
+
+			self.sleep(delay, method, url)
+			attempt += 1
+
+			with self.lock:
+				self.retry_count += 1
+
+	def verify_created(self, url):
+		# a POST whose outcome is unknown is considered done when the object can be
+		# read back from its own URL
+		def verify():
+			retrieve_requests = self.request('GET', url)
+
+			if retrieve_requests.status_code == 200:
+				return SentryResponse(201, retrieve_requests.json(), retrieve_requests.headers)
+
+			return None
+
+		return verify
+
+	def verify_created_in_list(self, url, field, value):
+		# same as verify_created for objects without a natural key in their URL,
+		# they are looked up in their listing instead
+		def verify():
+			for item in self.paginate(url):
+				if item.get(field) == value:
+					return SentryResponse(201, item)
+
+			return None
+
+		return verify
+
+	@classmethod
+	def project_fields(cls, body, paths):
+		# only the dot-separated key paths of a response body, nested as they were.
+		# A listing is projected item by item, missing paths are left out
+		if isinstance(body, list):
+			return [cls.project_fields(item, paths) for item in body]
+
+		if not isinstance(body, dict):
+			return body
+
+		projected = {}
+
+		for path in paths:
+			keys = path.split('.')
+			value = body
+
+			for key in keys:
+				if not isinstance(value, dict) or key not in value:
+					break
+				value = value[key]
+			else:
+				target = projected
+				for key in keys[:-1]:
+					target = target.setdefault(key, {})
+				target[keys[-1]] = value
+
+		return projected
+
+	def trim_result(self, result):
+		if self.result_mode == 'minimal':
+			result.pop('payload', None)
+
+		for name in self.RESULT_BODIES:
+			if self.result_mode == 'minimal':
+				result.pop(name, None)
+			elif self.return_fields and name in result:
+				result[name] = self.project_fields(result[name], self.return_fields)
+
+		for name in self.RESULT_LISTS:
+			for item in result.get(name) or []:
+				if isinstance(item, dict):
+					self.trim_result(item)
+
+		for name in self.RESULT_NESTED:
+			if isinstance(result.get(name), dict):
+				self.trim_result(result[name])
+
+		return result
+
+	def shape_result(self, result):
+		# Trim the task result before it goes back to Ansible. The methods keep the
+		# whole response since the modules read ids and current values from it, but
+		# a registered result, and the callback output, only needs return_fields of
+		# it, or none of it in minimal mode. The calls made are added with metrics,
+		# the timing with metrics or a trace file, and a failed task always reports it.
+		self.trim_result(result)
+
+		if self.calls is not None:
+			result['metrics'] = self.metrics()
+
+		if result.get('failed') or self.calls is not None or self.trace_file:
+			result['timing'] = self.timing()
+
+		return result
+
+	def error_result(self, error):
+		# task result of a SentryApiError which stopped the task
+		return self.shape_result(dict(
+			failed=True,
+			msg=str(error),
+			url=error.url,
+			status_code=error.status_code,
+			response=error.response
+		))
+
+	@staticmethod
+	def get_field(obj, path):
+		for key in path.split('.'):
+			if not isinstance(obj, dict):
+				return None
+			obj = obj.get(key)
+
+		return obj
+
+	@staticmethod
+	def project_team_slugs(project):
+		# slugs of the teams of a listed project. Current Sentry lists them under
+		# teams, older versions only give the one team
+		teams = project.get('teams') or ([project['team']] if project.get('team') else [])
+
+		return [team['slug'] for team in teams if isinstance(team, dict) and team.get('slug')]
+
+	@classmethod
+	def project_team_slug(cls, project):
+		# the team of a listed project, its first team when team is missing
+		team = project.get('team') or {}
+
+		if team.get('slug'):
+			return team['slug']
+
+		teams = cls.project_team_slugs(project)
+
+		return teams[0] if teams else None
+
+	@staticmethod
+	def same_value(desired, current):
+		# event lists and the like are unordered on Sentry side
+		if isinstance(desired, list) and isinstance(current, list):
+			return sorted(desired) == sorted(current)
+
+		return desired == current
+
+	def diff_payload(self, payload, current, fields):
+		changes = {}
+
+		for key, value in payload.items():
+			if value is None:
+				continue
+
+			if not self.same_value(value, self.get_field(current, fields.get(key, key))):
+				changes[key] = value
+
+		return changes
+
+	def prepare_payload(self, payload, current=None, fields=None):
+		# unset options are never sent, and when the remote object is known only
+		# the fields that differ from it are kept
+		if current is None:
+			return dict((key, value) for key, value in payload.items() if value is not None)
+
+		return self.diff_payload(payload, current, fields or {})
+
+	def unchanged_result(self, result, url, current, message):
+		result['changed'] = False
+		result['message'] = message
+		result['url'] = url
+		result['payload'] = {}
+		result['status_code'] = 200
+		result['response'] = current
+
+		return result
+
+	def follow_up_result(self, result, follow_up):
+		# a create completed by an update of the fields Sentry only accepts there.
+		# The create stays the result, the update is attached to it as then and
+		# the fields it sets join the diff
+		result['then'] = follow_up
+
+		diff = result.setdefault('diff', dict(before={}, after=dict(result.get('payload') or {})))
+		diff['after'].update(follow_up.get('payload') or {})
+
+		return result
+
+	def field_diff(self, payload, current, fields):
+		# per-field before/after, in the format of Ansible's --diff
+		return dict(
+			before=dict((key, self.get_field(current, fields.get(key, key))) for key in payload),
+			after=dict(payload)
+		)
+
+	def delete_diff(self, current, fields):
+		return dict(
+			before=dict((key, self.get_field(current, path)) for key, path in fields.items()),
+			after={}
+		)
+
+	def read_current(self, result, url):
+		# check mode: read the object a write would touch. Returns it, or None after
+		# filling result with the answer when it can't be read (e.g. 404)
+		retrieve_requests = self.request('GET', url, cache=True)
+
+		if retrieve_requests.status_code == 200:
+			return retrieve_requests.json()
+
+		result['changed'] = False
+		result['url'] = url
+		result['status_code'] = retrieve_requests.status_code
+		result['response'] = retrieve_requests.json()
+
+		return None
+
+	def planned_result(self, result, operation, url, payload, current, fields, message):
+		# check mode: what the write would send, with the status code it would get
+		result['changed'] = True
+		result['operation'] = operation
+		result['message'] = message
+		result['url'] = url
+
+		if operation == 'create':
+			payload = self.prepare_payload(payload)
+			result['payload'] = payload
+			result['status_code'] = 201
+			result['response'] = payload
+			result['diff'] = dict(before={}, after=dict(payload))
+		elif operation == 'update':
+			result['payload'] = payload
+			result['status_code'] = 200
+			result['response'] = current
+			result['diff'] = self.field_diff(payload, current, fields)
+		else:
+			result['status_code'] = 204
+			result['diff'] = self.delete_diff(current, fields)
+
+		return result
+
+	def get_url(self, task, **params):
+		return self.build_url(self.URLS[task].format(**params))
+
+	@classmethod
+	def parse_link_header(cls, header):
+		links = {}
+
+		for url, attributes in cls.LINK_PATTERN.findall(header or ''):
+			link = dict(url=url)
+
+			for attribute in attributes.split(';'):
+				key, sep, value = attribute.strip(' ,').partition('=')
+				if sep:
+					link[key.strip()] = value.strip().strip('"')
+
+			links[link.get('rel')] = link
+
+		return links
+
+	@staticmethod
+	def with_cursor(url, cursor):
+		# the cursor is applied on the URL we already called rather than taking the
+		# absolute link, which may carry Sentry's internal url-prefix behind a proxy
+		parts = urlsplit(url)
+		query = [(key, value) for key, value in parse_qsl(parts.query) if key != 'cursor']
+		query.append(('cursor', cursor))
+
+		return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query, safe=':'), parts.fragment))
+
+	def paginate(self, url):
+		# follow Sentry's cursor pagination lazily: the next page is only
+		# requested once the caller has consumed the current one
+		while url:
+			list_requests = self.request('GET', url)
+
+			if list_requests.status_code != 200:
+				raise SentryApiError(
+					"Failed to list %s" % url,
+					url=url,
+					status_code=list_requests.status_code,
+					response=list_requests.json()
+				)
+
+			for item in list_requests.json():
+				yield item
+
+			next_link = self.parse_link_header(list_requests.headers.get('Link')).get('next')
+
+			if next_link is None or next_link.get('results') != 'true':
+				break
+
+			url = self.with_cursor(url, next_link.get('cursor')) if next_link.get('cursor') else next_link['url']
 
 	def create_project(self, organization_slug, team_slug, name, slug):
-		self.organization_slug = organization_slug
-		self.team_slug = team_slug
-		result = self.result
+		result = dict()
 
 		payload = {
 	        'name': name,
 	        'slug': slug
 	    }
 
-		create_project_url = self.get_url('create-project')
+		create_project_url = self.get_url('create-project', organization_slug=organization_slug, team_slug=team_slug)
+
+		if self.check_mode:
+			return self.planned_result(result, 'create', create_project_url, payload, None, None, "Project would be created")
+
+		verify = None
+		if slug:
+			verify = self.verify_created(self.get_url('retrieve-project', organization_slug=organization_slug, project_slug=slug))
 
-		create_requests = requests.post(create_project_url, data=json.dumps(payload), headers=self.headers)
+		create_requests = self.request('POST', create_project_url, payload, verify=verify)
 
+		result['changed'] = True
+		result['operation'] = 'create'
 		result['message'] = "Project has been created"
 		result['url'] = create_project_url
 		result['payload'] = payload
@@ -148,14 +863,11 @@ class SentryApi(object):
 		return result
 
 	def retrieve_project(self, organization_slug, project_slug):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-
-		result = self.result
+		result = dict()
 
-		retrieve_project_url = self.get_url('retrieve-project')
+		retrieve_project_url = self.get_url('retrieve-project', organization_slug=organization_slug, project_slug=project_slug)
 
-		retrieve_requests = requests.get(retrieve_project_url, headers=self.headers)
+		retrieve_requests = self.request('GET', retrieve_project_url, cache=True)
 
 		result['message'] = "Project is available"
 		result['url'] = retrieve_project_url
@@ -164,42 +876,66 @@ class SentryApi(object):
 
 		return result
 
-	def update_project(self, organization_slug, project_slug, team_slug, name, slug, platform, is_bookmarked):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-
-		result = self.result
+	def update_project(self, organization_slug, project_slug, team_slug, name, slug, platform, is_bookmarked, current=None):
+		result = dict()
 
 		payload = {
 		    'name': name,
 		    'slug': slug,
 		    'team_slug': team_slug,
 		    'platform': platform,
-		    'is_bookmarked': is_bookmarked
+		    'isBookmarked': is_bookmarked
 		}
 
-		update_project_url = self.get_url('update-project')
+		update_project_url = self.get_url('update-project', organization_slug=organization_slug, project_slug=project_slug)
+
+		if self.check_mode and current is None:
+			current = self.read_current(result, update_project_url)
+
+			if current is None:
+				return result
 
-		update_requests = requests.put(update_project_url, data=json.dumps(payload), headers=self.headers)
+		payload = self.prepare_payload(payload, current, self.PROJECT_FIELDS)
+
+		if current is not None and not payload:
+			return self.unchanged_result(result, update_project_url, current, "Project is already up to date")
+
+		if self.check_mode:
+			return self.planned_result(result, 'update', update_project_url, payload, current, self.PROJECT_FIELDS, "Project would be updated")
+
+		update_requests = self.request('PUT', update_project_url, payload)
 
 		result['changed'] = True
+		result['operation'] = 'update'
 		result['message'] = "Project has been updated"
 		result['url'] = update_project_url
+		result['payload'] = payload
 		result['status_code'] = update_requests.status_code
 		result['response'] = update_requests.json()
 
+		if current is not None:
+			result['diff'] = self.field_diff(payload, current, self.PROJECT_FIELDS)
+
 		return result
 
-	def delete_project(self, organization_slug, project_slug):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		result = self.result
+	def delete_project(self, organization_slug, project_slug, current=None):
+		result = dict()
+
+		delete_project_url = self.get_url('delete-project', organization_slug=organization_slug, project_slug=project_slug)
+
+		if self.check_mode:
+			if current is None:
+				current = self.read_current(result, delete_project_url)
 
-		delete_project_url = self.get_url('delete-project')
+				if current is None:
+					return result
 
-		delete_requests = requests.delete(delete_project_url, headers=self.headers)
+			return self.planned_result(result, 'delete', delete_project_url, None, current, self.PROJECT_FIELDS, "Project would be deleted")
+
+		delete_requests = self.request('DELETE', delete_project_url)
 
 		result['changed'] = True
+		result['operation'] = 'delete'
 		result['message'] = "Project has been deleted"
 		result['url'] = delete_project_url
 		result['status_code'] = delete_requests.status_code
@@ -210,18 +946,26 @@ class SentryApi(object):
 		return result
 
 	def create_team(self, organization_slug, name, slug):
-		self.organization_slug = organization_slug
-		result = self.result
+		result = dict()
 
 		payload = {
 	        'name': name,
 	        'slug': slug
 	    }
 
-		create_team_url = self.get_url('create-team')
+		create_team_url = self.get_url('create-team', organization_slug=organization_slug)
+
+		if self.check_mode:
+			return self.planned_result(result, 'create', create_team_url, payload, None, None, "Team would be created")
 
-		create_requests = requests.post(create_team_url, data=json.dumps(payload), headers=self.headers)
+		verify = None
+		if slug:
+			verify = self.verify_created(self.get_url('retrieve-team', organization_slug=organization_slug, team_slug=slug))
 
+		create_requests = self.request('POST', create_team_url, payload, verify=verify)
+
+		result['changed'] = True
+		result['operation'] = 'create'
 		result['message'] = "Team has been created"
 		result['url'] = create_team_url
 		result['payload'] = payload
@@ -231,14 +975,11 @@ class SentryApi(object):
 		return result
 
 	def retrieve_team(self, organization_slug, team_slug):
-		self.organization_slug = organization_slug
-		self.team_slug = team_slug
+		result = dict()
 
-		result = self.result
+		retrieve_team_url = self.get_url('retrieve-team', organization_slug=organization_slug, team_slug=team_slug)
 
-		retrieve_team_url = self.get_url('retrieve-team')
-
-		retrieve_requests = requests.get(retrieve_team_url, headers=self.headers)
+		retrieve_requests = self.request('GET', retrieve_team_url, cache=True)
 
 		result['message'] = "Team is available"
 		result['url'] = retrieve_team_url
@@ -247,39 +988,63 @@ class SentryApi(object):
 
 		return result
 
-	def update_team(self, organization_slug, team_slug, name, slug):
-		self.organization_slug = organization_slug
-		self.team_slug = team_slug
-
-		result = self.result
+	def update_team(self, organization_slug, team_slug, name, slug, current=None):
+		result = dict()
 
 		payload = {
 		    'name': name,
 		    'slug': slug
 		}
 
-		update_team_url = self.get_url('update-team')
+		update_team_url = self.get_url('update-team', organization_slug=organization_slug, team_slug=team_slug)
 
-		update_requests = requests.put(update_team_url, data=json.dumps(payload), headers=self.headers)
+		if self.check_mode and current is None:
+			current = self.read_current(result, update_team_url)
+
+			if current is None:
+				return result
+
+		payload = self.prepare_payload(payload, current, self.TEAM_FIELDS)
+
+		if current is not None and not payload:
+			return self.unchanged_result(result, update_team_url, current, "Team is already up to date")
+
+		if self.check_mode:
+			return self.planned_result(result, 'update', update_team_url, payload, current, self.TEAM_FIELDS, "Team would be updated")
+
+		update_requests = self.request('PUT', update_team_url, payload)
 
 		result['changed'] = True
+		result['operation'] = 'update'
 		result['message'] = "Team has been updated"
 		result['url'] = update_team_url
+		result['payload'] = payload
 		result['status_code'] = update_requests.status_code
 		result['response'] = update_requests.json()
 
+		if current is not None:
+			result['diff'] = self.field_diff(payload, current, self.TEAM_FIELDS)
+
 		return result
 
-	def delete_team(self, organization_slug, team_slug):
-		self.organization_slug = organization_slug
-		self.team_slug = team_slug
-		result = self.result
+	def delete_team(self, organization_slug, team_slug, current=None):
+		result = dict()
+
+		delete_team_url = self.get_url('delete-team', organization_slug=organization_slug, team_slug=team_slug)
+
+		if self.check_mode:
+			if current is None:
+				current = self.read_current(result, delete_team_url)
 
-		delete_team_url = self.get_url('delete-team')
+				if current is None:
+					return result
 
-		delete_requests = requests.delete(delete_team_url, headers=self.headers)
+			return self.planned_result(result, 'delete', delete_team_url, None, current, self.TEAM_FIELDS, "Team would be deleted")
+
+		delete_requests = self.request('DELETE', delete_team_url)
 
 		result['changed'] = True
+		result['operation'] = 'delete'
 		result['message'] = "Team has been deleted"
 		result['url'] = delete_team_url
 		result['status_code'] = delete_requests.status_code
@@ -290,13 +1055,11 @@ class SentryApi(object):
 		return result
 
 	def retrieve_organization(self, organization_slug):
-		self.organization_slug = organization_slug
-
-		result = self.result
+		result = dict()
 
-		retrieve_organization_url = self.get_url('retrieve-organization')
+		retrieve_organization_url = self.get_url('retrieve-organization', organization_slug=organization_slug)
 
-		retrieve_requests = requests.get(retrieve_organization_url, headers=self.headers)
+		retrieve_requests = self.request('GET', retrieve_organization_url, cache=True)
 
 		result['url'] = retrieve_organization_url
 		result['status_code'] = retrieve_requests.status_code
@@ -311,24 +1074,38 @@ class SentryApi(object):
 
 		return result
 
-	def update_organization(self, organization_slug, name, slug):
-		self.organization_slug = organization_slug
-
-		result = self.result
+	def update_organization(self, organization_slug, name, slug, current=None):
+		result = dict()
 
 		payload = {
 		    'name': name,
 		    'slug': slug
 		}
 
-		update_organization_url = self.get_url('update-organization')
+		update_organization_url = self.get_url('update-organization', organization_slug=organization_slug)
+
+		if self.check_mode and current is None:
+			current = self.read_current(result, update_organization_url)
+
+			if current is None:
+				return result
 
-		update_requests = requests.put(update_organization_url, data=json.dumps(payload), headers=self.headers)
+		payload = self.prepare_payload(payload, current, self.ORGANIZATION_FIELDS)
+
+		if current is not None and not payload:
+			return self.unchanged_result(result, update_organization_url, current, "Organization is already up to date")
+
+		if self.check_mode:
+			return self.planned_result(result, 'update', update_organization_url, payload, current, self.ORGANIZATION_FIELDS, "Organization would be updated")
+
+		update_requests = self.request('PUT', update_organization_url, payload)
 
 		result['url'] = update_organization_url
+		result['payload'] = payload
 		result['status_code'] = update_requests.status_code
 
 		result['changed'] = True
+		result['operation'] = 'update'
 		result['message'] = "Organization has been updated"
 
 		if update_requests.status_code != 200:
@@ -336,21 +1113,31 @@ class SentryApi(object):
 
 		result['response'] = update_requests.json()
 
+		if current is not None:
+			result['diff'] = self.field_diff(payload, current, self.ORGANIZATION_FIELDS)
+
 		return result
 
 	def create_client_key(self, organization_slug, project_slug, name):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		result = self.result
+		result = dict()
 
 		payload = {
 	        'name': name
 	    }
 
-		create_client_key_url = self.get_url('create-client-key')
+		create_client_key_url = self.get_url('create-client-key', organization_slug=organization_slug, project_slug=project_slug)
 
-		create_requests = requests.post(create_client_key_url, data=json.dumps(payload), headers=self.headers)
+		if self.check_mode:
+			return self.planned_result(result, 'create', create_client_key_url, payload, None, None, "Project Client Key would be created")
 
+		verify = None
+		if name:
+			verify = self.verify_created_in_list(create_client_key_url, 'name', name)
+
+		create_requests = self.request('POST', create_client_key_url, payload, verify=verify)
+
+		result['changed'] = True
+		result['operation'] = 'create'
 		result['message'] = "Project Client Key has been created"
 		result['url'] = create_client_key_url
 		result['payload'] = payload
@@ -359,42 +1146,65 @@ class SentryApi(object):
 
 		return result
 
-	def update_client_key(self, organization_slug, project_slug, client_key, name, is_active):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		self.client_key = client_key
-
-		result = self.result
+	def update_client_key(self, organization_slug, project_slug, client_key, name, is_active, current=None):
+		result = dict()
 
 		payload = {
 		   'name': name,
 		   'isActive': is_active
 		}
 
-		update_client_key_url = self.get_url('update-client-key')
+		update_client_key_url = self.get_url('update-client-key', organization_slug=organization_slug, project_slug=project_slug, client_key=client_key)
+
+		if self.check_mode and current is None:
+			current = self.read_current(result, update_client_key_url)
+
+			if current is None:
+				return result
+
+		payload = self.prepare_payload(payload, current, self.CLIENT_KEY_FIELDS)
+
+		if current is not None and not payload:
+			return self.unchanged_result(result, update_client_key_url, current, "Project Client Key is already up to date")
+
+		if self.check_mode:
+			return self.planned_result(result, 'update', update_client_key_url, payload, current, self.CLIENT_KEY_FIELDS, "Project Client Key would be updated")
 
-		update_requests = requests.put(update_client_key_url, data=json.dumps(payload), headers=self.headers)
+		update_requests = self.request('PUT', update_client_key_url, payload)
+		self.drop_client_key_dsns(organization_slug, project_slug)
 
 		result['changed'] = True
+		result['operation'] = 'update'
 		result['message'] = "Project Client Key has been updated"
 		result['url'] = update_client_key_url
+		result['payload'] = payload
 		result['status_code'] = update_requests.status_code
 		result['response'] = update_requests.json()
 
+		if current is not None:
+			result['diff'] = self.field_diff(payload, current, self.CLIENT_KEY_FIELDS)
+
 		return result
 
-	def delete_client_key(self, organization_slug, project_slug, client_key):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		self.client_key = client_key
+	def delete_client_key(self, organization_slug, project_slug, client_key, current=None):
+		result = dict()
+
+		delete_client_key_url = self.get_url('delete-client-key', organization_slug=organization_slug, project_slug=project_slug, client_key=client_key)
 
-		result = self.result
+		if self.check_mode:
+			if current is None:
+				current = self.read_current(result, delete_client_key_url)
 
-		delete_client_key_url = self.get_url('delete-client-key')
+				if current is None:
+					return result
 
-		delete_requests = requests.delete(delete_client_key_url, headers=self.headers)
+			return self.planned_result(result, 'delete', delete_client_key_url, None, current, self.CLIENT_KEY_FIELDS, "Project Client Key would be deleted")
+
+		delete_requests = self.request('DELETE', delete_client_key_url)
+		self.drop_client_key_dsns(organization_slug, project_slug)
 
 		result['changed'] = True
+		result['operation'] = 'delete'
 		result['message'] = "Project Client Key has been deleted"
 		result['url'] = delete_client_key_url
 		result['status_code'] = delete_requests.status_code
@@ -405,20 +1215,24 @@ class SentryApi(object):
 		return result
 
 	def create_service_hook(self, organization_slug, project_slug, hook_url, hook_events):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-
-		result = self.result
+		result = dict()
 
 		payload = {
 	        'url': hook_url,
 	        'events': hook_events
 	    }
 
-		create_service_hook_url = self.get_url('create-service-hook')
+		create_service_hook_url = self.get_url('create-service-hook', organization_slug=organization_slug, project_slug=project_slug)
 
-		create_requests = requests.post(create_service_hook_url, data=json.dumps(payload), headers=self.headers)
+		if self.check_mode:
+			return self.planned_result(result, 'create', create_service_hook_url, payload, None, None, "Project Service Hook would be created")
 
+		verify = self.verify_created_in_list(create_service_hook_url, 'url', hook_url)
+
+		create_requests = self.request('POST', create_service_hook_url, payload, verify=verify)
+
+		result['changed'] = True
+		result['operation'] = 'create'
 		result['message'] = "Project Service Hook has been created"
 		result['url'] = create_service_hook_url
 		result['payload'] = payload
@@ -427,43 +1241,63 @@ class SentryApi(object):
 
 		return result
 
-	def update_service_hook(self, organization_slug, project_slug, hook_id, hook_url, hook_events):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		self.hook_id = hook_id
-
-		result = self.result
+	def update_service_hook(self, organization_slug, project_slug, hook_id, hook_url, hook_events, current=None):
+		result = dict()
 
 		payload = {
 	        'url': hook_url,
 	        'events': hook_events
 	    }
 
-		update_service_hook_url = self.get_url('update-service-hook')
+		update_service_hook_url = self.get_url('update-service-hook', organization_slug=organization_slug, project_slug=project_slug, hook_id=hook_id)
 
-		update_requests = requests.put(update_service_hook_url, data=json.dumps(payload), headers=self.headers)
+		if self.check_mode and current is None:
+			current = self.read_current(result, update_service_hook_url)
+
+			if current is None:
+				return result
+
+		payload = self.prepare_payload(payload, current, self.SERVICE_HOOK_FIELDS)
+
+		if current is not None and not payload:
+			return self.unchanged_result(result, update_service_hook_url, current, "Project Service Hook is already up to date")
+
+		if self.check_mode:
+			return self.planned_result(result, 'update', update_service_hook_url, payload, current, self.SERVICE_HOOK_FIELDS, "Project Service Hook would be updated")
+
+		update_requests = self.request('PUT', update_service_hook_url, payload)
 
 		result['changed'] = True
+		result['operation'] = 'update'
 		result['message'] = "Project Service Hook has been updated"
 		result['url'] = update_service_hook_url
 		result['payload'] = payload
 		result['response'] = update_requests.json()
 		result['status_code'] = update_requests.status_code
 
+		if current is not None:
+			result['diff'] = self.field_diff(payload, current, self.SERVICE_HOOK_FIELDS)
+
 		return result
 
-	def delete_service_hook(self, organization_slug, project_slug, hook_id):
-		self.organization_slug = organization_slug
-		self.project_slug = project_slug
-		self.hook_id = hook_id
+	def delete_service_hook(self, organization_slug, project_slug, hook_id, current=None):
+		result = dict()
+
+		delete_service_hook_url = self.get_url('delete-service-hook', organization_slug=organization_slug, project_slug=project_slug, hook_id=hook_id)
 
-		result = self.result
+		if self.check_mode:
+			if current is None:
+				current = self.read_current(result, delete_service_hook_url)
 
-		delete_service_hook_url = self.get_url('delete-service-hook')
+				if current is None:
+					return result
 
-		delete_requests = requests.delete(delete_service_hook_url, headers=self.headers)
+			return self.planned_result(result, 'delete', delete_service_hook_url, None, current, self.SERVICE_HOOK_FIELDS, "Project Service Hook would be deleted")
+
+		delete_requests = self.request('DELETE', delete_service_hook_url)
 
 		result['changed'] = True
+		result['operation'] = 'delete'
 		result['message'] = "Project Service Hook has been deleted"
 		result['url'] = delete_service_hook_url
 		result['status_code'] = delete_requests.status_code
@@ -472,3 +1306,88 @@ class SentryApi(object):
 			result['response'] = delete_requests.json()
 
 		return result
+
+	def iter_projects(self, organization_slug):
+		return self.paginate(self.get_url('list-projects', organization_slug=organization_slug))
+
+	def project_index(self, organization_slug):
+		# slug -> summary of every project in the organization, built from the paged
+		# org-wide listing. It carries the fields compared by update_project so it can
+		# stand in for retrieve_project when deciding between create and update
+		index = {}
+
+		for project in self.iter_projects(organization_slug):
+			teams = self.project_team_slugs(project)
+			team_slug = self.project_team_slug(project)
+
+			index[project['slug']] = dict(
+				id=project.get('id'),
+				slug=project['slug'],
+				name=project.get('name'),
+				platform=project.get('platform'),
+				isBookmarked=project.get('isBookmarked'),
+				team=dict(slug=team_slug) if team_slug else None,
+				teams=teams
+			)
+
+		return index
+
+	def iter_team_projects(self, organization_slug, team_slug):
+		return self.paginate(self.get_url('list-team-projects', organization_slug=organization_slug, team_slug=team_slug))
+
+	def iter_teams(self, organization_slug):
+		return self.paginate(self.get_url('list-teams', organization_slug=organization_slug))
+
+	def iter_client_keys(self, organization_slug, project_slug):
+		return self.paginate(self.get_url('list-client-keys', organization_slug=organization_slug, project_slug=project_slug))
+
+	def find_client_key(self, organization_slug, project_slug, name=None, client_key_id=None):
+		# client key of the project with this id, or the first one with this name,
+		# or None. The listing stops paging as soon as it is found
+		for client_key in self.iter_client_keys(organization_slug, project_slug):
+			if client_key_id is not None and client_key.get('id') == client_key_id:
+				return client_key
+
+			if client_key_id is None and client_key.get('name') == name:
+				return client_key
+
+		return None
+
+	def client_key_dsns(self, organization_slug, project_slug):
+		# name, state and public DSN of every client key of the project. Only this
+		# summary goes to the response cache, never the secret parts of the keys.
+		# It is cached under the listing URL, which is also the URL keys are
+		# created on, so a key created through the collection drops it. Updates
+		# and deletes drop it with drop_client_key_dsns.
+		list_client_keys_url = self.get_url('list-client-keys', organization_slug=organization_slug, project_slug=project_slug)
+
+		if self.cache is not None:
+			dsns = self.cache.get(list_client_keys_url)
+
+			if dsns is not None:
+				with self.lock:
+					self.cache_hits += 1
+				return dsns
+
+		dsns = [
+			dict(
+				id=client_key['id'],
+				name=client_key.get('name'),
+				is_active=client_key.get('isActive', True),
+				dsn=(client_key.get('dsn') or {}).get('public')
+			)
+			for client_key in self.iter_client_keys(organization_slug, project_slug)
+		]
+
+		if self.cache is not None:
+			self.cache.set(list_client_keys_url, dsns)
+
+		return dsns
+
+	def drop_client_key_dsns(self, organization_slug, project_slug):
+		# a key written on its own URL leaves the cached summary of the listing stale
+		if self.cache is not None:
+			self.cache.invalidate(self.get_url('list-client-keys', organization_slug=organization_slug, project_slug=project_slug))
+
+	def iter_service_hooks(self, organization_slug, project_slug):
+		return self.paginate(self.get_url('list-service-hooks', organization_slug=organization_slug, project_slug=project_slug))
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fnmatch import fnmatchcase
+
+
+DEFAULT_CONCURRENCY = 8
+GLOB_CHARACTERS = '*?['
+
+
+def call_safely(worker, item):
+	# a worker that raises does not abort the others, its item is reported as
+	# failed instead
+	try:
+		return worker(item)
+	except Exception as e:
+		return dict(
+			failed=True,
+			changed=False,
+			message="%s: %s" % (type(e).__name__, e)
+		)
+
+
+def run_concurrently(worker, items, concurrency=DEFAULT_CONCURRENCY):
+	# run worker(item) for every item on a bounded thread pool and return the
+	# results in the order of items
+	def safe_worker(item):
+		return call_safely(worker, item)
+
+	items = list(items)
+
+	if not items:
+		return []
+
+	concurrency = max(1, min(concurrency or 1, len(items)))
+
+	if concurrency == 1:
+		return [safe_worker(item) for item in items]
+
+	with ThreadPoolExecutor(max_workers=concurrency) as executor:
+		return list(executor.map(safe_worker, items))
+
+
+def run_graph(worker, items, requires, concurrency=DEFAULT_CONCURRENCY):
+	# Run worker(item) for every item of a dependency graph on a bounded thread
+	# pool. requires[i] lists the indexes of the items item i depends on, it starts
+	# as soon as they all succeeded, independent branches run side by side. An
+	# item whose requirement failed or was skipped is skipped too. Results come in
+	# the order of items.
+	items = list(items)
+	results = [None] * len(items)
+	pending = set(range(len(items)))
+	running = {}
+
+	with ThreadPoolExecutor(max_workers=max(1, concurrency or 1)) as executor:
+		while pending or running:
+			progress = True
+
+			while progress:
+				progress = False
+
+				for index in sorted(pending):
+					required = [results[other] for other in requires[index]]
+
+					if any(result is None for result in required):
+						continue
+
+					pending.discard(index)
+					progress = True
+
+					if any(result.get('failed') or result.get('skipped') for result in required):
+						results[index] = dict(changed=False, skipped=True, message="Skipped, a dependency did not succeed")
+					else:
+						running[executor.submit(call_safely, worker, items[index])] = index
+
+			if not running:
+				# only a dependency cycle can leave items pending here
+				for index in pending:
+					results[index] = dict(changed=False, failed=True, message="Dependency cycle")
+				break
+
+			done, dummy = wait(running, return_when=FIRST_COMPLETED)
+
+			for future in done:
+				results[running.pop(future)] = future.result()
+
+	return results
+
+
+def summarize(results):
+	summary = dict(total=len(results), changed=0, unchanged=0, failed=0, skipped=0)
+
+	for result in results:
+		if result.get('failed'):
+			summary['failed'] += 1
+		elif result.get('skipped'):
+			summary['skipped'] += 1
+		elif result.get('changed'):
+			summary['changed'] += 1
+		else:
+			summary['unchanged'] += 1
+
+	return summary
+
+
+def resolve_projects(sentry_api, organization_slug, projects, team_slug=None):
+	# Slugs of the selected projects. Plain slugs are taken as they are, shell-style
+	# patterns cost one listing of the organization's projects and team_slug one
+	# listing of the team's projects. A project selected twice is returned once.
+	project_slugs = [project for project in projects if not any(char in project for char in GLOB_CHARACTERS)]
+	patterns = [project for project in projects if any(char in project for char in GLOB_CHARACTERS)]
+
+	if patterns:
+		for project in sentry_api.iter_projects(organization_slug):
+			if any(fnmatchcase(project['slug'], pattern) for pattern in patterns):
+				project_slugs.append(project['slug'])
+
+	if team_slug:
+		for project in sentry_api.iter_team_projects(organization_slug, team_slug):
+			project_slugs.append(project['slug'])
+
+	return sorted(set(project_slugs), key=project_slugs.index)
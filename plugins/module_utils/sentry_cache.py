@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class ResponseCache(object):
+	# Read-through cache of Sentry GET responses shared by every process on this
+	# machine, e.g. all the forks of a play running on the controller. Each URL is
+	# one small JSON file written atomically (write then rename), so readers never
+	# see a partial entry and no lock is needed. Entries are namespaced by host and
+	# token, a client never reads what another token was allowed to see.
+
+	CACHE_DIR = os.path.join(tempfile.gettempdir(), 'ansible-sentry-cache')
+
+	def __init__(self, namespace, ttl, cache_dir=None):
+		self.ttl = float(ttl)
+		self.namespace = hashlib.sha1(namespace.encode('utf-8')).hexdigest()
+		self.cache_dir = cache_dir or self.CACHE_DIR
+
+		if not os.path.isdir(self.cache_dir):
+			try:
+				os.makedirs(self.cache_dir, 0o700)
+			except OSError:
+				# another fork created it in the meantime
+				pass
+
+	def path(self, url):
+		key = hashlib.sha1((self.namespace + url).encode('utf-8')).hexdigest()
+		return os.path.join(self.cache_dir, key + '.json')
+
+	def get(self, url):
+		# the cached body, or None when missing or expired
+		try:
+			with open(self.path(url)) as cache_file:
+				entry = json.load(cache_file)
+		except (IOError, OSError, ValueError):
+			return None
+
+		if entry.get('expires', 0) < time.time():
+			return None
+
+		return entry.get('body')
+
+	def set(self, url, body):
+		entry = dict(expires=time.time() + self.ttl, body=body)
+
+		try:
+			fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+		except OSError:
+			# a cache that can't be written only costs the next read a request
+			return
+
+		try:
+			with os.fdopen(fd, 'w') as cache_file:
+				json.dump(entry, cache_file)
+			os.replace(tmp_path, self.path(url))
+		except (IOError, OSError, TypeError, ValueError):
+			try:
+				os.remove(tmp_path)
+			except OSError:
+				pass
+
+	def invalidate(self, url):
+		try:
+			os.remove(self.path(url))
+		except OSError:
+			pass
@@ -0,0 +1,32 @@
+#!/usr/bin/python
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi, SentryApiError
+
+
+def run_sentry_module(argument_spec, run_task):
+	# Entry point of every module when it runs on the target host. run_task is the
+	# same function the action plugin calls on the controller: it gets the client
+	# and the validated options and returns the task result. The bulk modules
+	# share this one client between their workers, and with transport=requests
+	# its connection pool.
+	module = AnsibleModule(
+		argument_spec=argument_spec,
+		supports_check_mode=True
+	)
+
+	sentry_api = SentryApi.from_module(module)
+
+	try:
+		result = run_task(sentry_api, module.params)
+	except SentryApiError as e:
+		module.fail_json(**sentry_api.error_result(e))
+	finally:
+		sentry_api.close()
+
+	result = sentry_api.shape_result(result)
+
+	if result.get('failed'):
+		module.fail_json(**result)
+
+	module.exit_json(**result)
@@ -0,0 +1,524 @@
+#!/usr/bin/python
+
+import json
+import os
+import tempfile
+import time
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, run_graph, summarize, DEFAULT_CONCURRENCY
+
+
+PLAN_VERSION = 1
+
+# A plan is a list of waves, each wave a list of operations which don't depend
+# on each other and can run in parallel. A wave only starts once the previous
+# one succeeded: teams exist before their projects, projects before their keys
+# and hooks, and deletes go children first.
+WAVE_TEAMS = 0
+WAVE_PROJECTS = 1
+WAVE_PROJECT_RESOURCES = 2
+WAVE_PROJECT_DELETES = 3
+WAVE_TEAM_DELETES = 4
+WAVE_COUNT = 5
+
+# the only SentryApi methods a plan file is allowed to call
+PLAN_METHODS = (
+	'create_team', 'update_team', 'delete_team',
+	'create_project', 'update_project', 'delete_project',
+	'create_client_key', 'update_client_key', 'delete_client_key',
+	'create_service_hook', 'update_service_hook', 'delete_service_hook',
+)
+
+EXPECTED_STATUS_CODES = dict(create=201, update=200, delete=204)
+
+
+def operation(kind, op, target, method, args, diff=None, then=None):
+	# One write of the plan. then is an optional follow-up call made with the id
+	# of the object just created, for the fields Sentry only accepts on update.
+	result = dict(kind=kind, operation=op, target=target, method=method, args=args)
+
+	if diff:
+		result['diff'] = diff
+
+	if then:
+		result['then'] = then
+
+	return result
+
+
+def follow_up(method, args, id_arg, id_field):
+	return dict(method=method, args=args, id_arg=id_arg, id_field=id_field)
+
+
+def find_existing(current, state, current_slug, slug):
+	# the object a declared item refers to and its current slug. A rename applied
+	# by an earlier run only leaves the new slug, the item then targets that one
+	existing = current.get(current_slug)
+
+	if existing is None and state != 'absent' and slug and slug in current:
+		return slug, current[slug]
+
+	return current_slug, existing
+
+
+def plan_teams(sentry_api, organization_slug, teams, waves):
+	current = dict((team['slug'], team) for team in sentry_api.iter_teams(organization_slug))
+
+	for team in teams:
+		team_slug, existing = find_existing(current, team['state'], team['team_slug'] or team['slug'], team['slug'])
+
+		if team['state'] == 'absent':
+			if existing is not None:
+				waves[WAVE_TEAM_DELETES].append(operation(
+					'team', 'delete', team_slug, 'delete_team',
+					dict(organization_slug=organization_slug, team_slug=team_slug),
+					diff=sentry_api.delete_diff(existing, sentry_api.TEAM_FIELDS)
+				))
+
+		elif existing is None:
+			payload = sentry_api.prepare_payload(dict(name=team['name'], slug=team['slug'] or team_slug))
+			waves[WAVE_TEAMS].append(operation(
+				'team', 'create', team_slug, 'create_team',
+				dict(organization_slug=organization_slug, name=team['name'], slug=team['slug'] or team_slug),
+				diff=dict(before={}, after=payload)
+			))
+
+		else:
+			payload = sentry_api.prepare_payload(dict(name=team['name'], slug=team['slug']), existing, sentry_api.TEAM_FIELDS)
+
+			if payload:
+				waves[WAVE_TEAMS].append(operation(
+					'team', 'update', team_slug, 'update_team',
+					dict(organization_slug=organization_slug, team_slug=team_slug, name=payload.get('name'), slug=payload.get('slug')),
+					diff=sentry_api.field_diff(payload, existing, sentry_api.TEAM_FIELDS)
+				))
+
+
+def plan_projects(sentry_api, organization_slug, projects, index, waves):
+	for project in projects:
+		project_slug, existing = find_existing(index, project['state'], project['project_slug'] or project['slug'], project['slug'])
+
+		if project['state'] == 'absent':
+			if existing is not None:
+				waves[WAVE_PROJECT_DELETES].append(operation(
+					'project', 'delete', project_slug, 'delete_project',
+					dict(organization_slug=organization_slug, project_slug=project_slug),
+					diff=sentry_api.delete_diff(existing, sentry_api.PROJECT_FIELDS)
+				))
+
+		elif existing is None:
+			slug = project['slug'] or project_slug
+			then = None
+
+			if not project['team_slug']:
+				raise SentryApiError("team_slug is required to create project %s" % slug)
+
+			# platform and bookmark can't be set on creation
+			if project['platform'] is not None or project['is_bookmarked'] is not None:
+				then = follow_up(
+					'update_project',
+					dict(organization_slug=organization_slug, team_slug=None, name=None, slug=None,
+						platform=project['platform'], is_bookmarked=project['is_bookmarked']),
+					'project_slug', 'slug'
+				)
+
+			payload = dict(name=project['name'], slug=slug, team_slug=project['team_slug'],
+				platform=project['platform'], isBookmarked=project['is_bookmarked'])
+
+			waves[WAVE_PROJECTS].append(operation(
+				'project', 'create', slug, 'create_project',
+				dict(organization_slug=organization_slug, team_slug=project['team_slug'], name=project['name'], slug=slug),
+				diff=dict(before={}, after=sentry_api.prepare_payload(payload)),
+				then=then
+			))
+
+		else:
+			payload = dict(name=project['name'], slug=project['slug'], team_slug=project['team_slug'],
+				platform=project['platform'], isBookmarked=project['is_bookmarked'])
+			payload = sentry_api.prepare_payload(payload, existing, sentry_api.PROJECT_FIELDS)
+
+			if payload:
+				waves[WAVE_PROJECTS].append(operation(
+					'project', 'update', project_slug, 'update_project',
+					dict(organization_slug=organization_slug, project_slug=project_slug, team_slug=payload.get('team_slug'),
+						name=payload.get('name'), slug=payload.get('slug'), platform=payload.get('platform'),
+						is_bookmarked=payload.get('isBookmarked')),
+					diff=sentry_api.field_diff(payload, existing, sentry_api.PROJECT_FIELDS)
+				))
+
+
+def list_project_resources(sentry_api, organization_slug, items, index, renames, lister, concurrency):
+	# current keys or hooks of every project referenced by items, listed in
+	# parallel. Items refer to projects by their final slug, a project renamed by
+	# the plan is listed under its current slug and a project to create has none.
+	project_slugs = sorted(set(item['project_slug'] for item in items))
+
+	def worker(project_slug):
+		listing_slug = renames.get(project_slug, project_slug)
+
+		if listing_slug not in index:
+			return []
+
+		return list(lister(organization_slug, listing_slug))
+
+	listings = run_concurrently(worker, project_slugs, concurrency)
+
+	for project_slug, listing in zip(project_slugs, listings):
+		if isinstance(listing, dict) and listing.get('failed'):
+			raise SentryApiError("Failed to list resources of project %s: %s" % (project_slug, listing['message']))
+
+	return dict(zip(project_slugs, listings))
+
+
+def plan_client_keys(sentry_api, organization_slug, client_keys, current, waves):
+	# client keys are matched by name within their project
+	for client_key in client_keys:
+		project_slug = client_key['project_slug']
+		existing = None
+
+		for key in current.get(project_slug, []):
+			if key.get('name') == client_key['name']:
+				existing = key
+				break
+
+		target = "%s/%s" % (project_slug, client_key['name'])
+
+		if client_key['state'] == 'absent':
+			if existing is not None:
+				waves[WAVE_PROJECT_RESOURCES].append(operation(
+					'client_key', 'delete', target, 'delete_client_key',
+					dict(organization_slug=organization_slug, project_slug=project_slug, client_key=existing['id']),
+					diff=sentry_api.delete_diff(existing, sentry_api.CLIENT_KEY_FIELDS)
+				))
+
+		elif existing is None:
+			then = None
+
+			if client_key['is_active'] is False:
+				then = follow_up(
+					'update_client_key',
+					dict(organization_slug=organization_slug, project_slug=project_slug, name=None, is_active=False),
+					'client_key', 'id'
+				)
+
+			waves[WAVE_PROJECT_RESOURCES].append(operation(
+				'client_key', 'create', target, 'create_client_key',
+				dict(organization_slug=organization_slug, project_slug=project_slug, name=client_key['name']),
+				diff=dict(before={}, after=sentry_api.prepare_payload(dict(name=client_key['name'], isActive=client_key['is_active']))),
+				then=then
+			))
+
+		else:
+			payload = sentry_api.prepare_payload(dict(isActive=client_key['is_active']), existing, sentry_api.CLIENT_KEY_FIELDS)
+
+			if payload:
+				waves[WAVE_PROJECT_RESOURCES].append(operation(
+					'client_key', 'update', target, 'update_client_key',
+					dict(organization_slug=organization_slug, project_slug=project_slug, client_key=existing['id'],
+						name=None, is_active=payload.get('isActive')),
+					diff=sentry_api.field_diff(payload, existing, sentry_api.CLIENT_KEY_FIELDS)
+				))
+
+
+def plan_service_hooks(sentry_api, organization_slug, service_hooks, current, waves):
+	# service hooks are matched by url within their project
+	for service_hook in service_hooks:
+		project_slug = service_hook['project_slug']
+		existing = None
+
+		for hook in current.get(project_slug, []):
+			if hook.get('url') == service_hook['url']:
+				existing = hook
+				break
+
+		target = "%s/%s" % (project_slug, service_hook['url'])
+
+		if service_hook['state'] == 'absent':
+			if existing is not None:
+				waves[WAVE_PROJECT_RESOURCES].append(operation(
+					'service_hook', 'delete', target, 'delete_service_hook',
+					dict(organization_slug=organization_slug, project_slug=project_slug, hook_id=existing['id']),
+					diff=sentry_api.delete_diff(existing, sentry_api.SERVICE_HOOK_FIELDS)
+				))
+
+		elif existing is None:
+			waves[WAVE_PROJECT_RESOURCES].append(operation(
+				'service_hook', 'create', target, 'create_service_hook',
+				dict(organization_slug=organization_slug, project_slug=project_slug,
+					hook_url=service_hook['url'], hook_events=service_hook['events']),
+				diff=dict(before={}, after=dict(url=service_hook['url'], events=service_hook['events']))
+			))
+
+		else:
+			payload = sentry_api.prepare_payload(dict(events=service_hook['events']), existing, sentry_api.SERVICE_HOOK_FIELDS)
+
+			if payload:
+				waves[WAVE_PROJECT_RESOURCES].append(operation(
+					'service_hook', 'update', target, 'update_service_hook',
+					dict(organization_slug=organization_slug, project_slug=project_slug, hook_id=existing['id'],
+						hook_url=service_hook['url'], hook_events=payload['events']),
+					diff=sentry_api.field_diff(payload, existing, sentry_api.SERVICE_HOOK_FIELDS)
+				))
+
+
+def build_plan(sentry_api, organization_slug, teams=None, projects=None, client_keys=None, service_hooks=None, concurrency=DEFAULT_CONCURRENCY):
+	# Compute the writes turning live Sentry into the desired state, reading
+	# through listings only: one paged listing for teams, one for projects, and
+	# one per project whose keys or hooks are managed.
+	teams = teams or []
+	projects = projects or []
+	client_keys = client_keys or []
+	service_hooks = service_hooks or []
+
+	waves = [[] for i in range(WAVE_COUNT)]
+
+	if teams:
+		plan_teams(sentry_api, organization_slug, teams, waves)
+
+	index = {}
+	if projects or client_keys or service_hooks:
+		index = sentry_api.project_index(organization_slug)
+
+	plan_projects(sentry_api, organization_slug, projects, index, waves)
+
+	# only the renames still to apply, the old slug is gone once they ran
+	renames = dict(
+		(project['slug'], project['project_slug'])
+		for project in projects
+		if project['project_slug'] and project['slug'] and project['slug'] != project['project_slug'] and project['project_slug'] in index
+	)
+
+	if client_keys:
+		current = list_project_resources(sentry_api, organization_slug, client_keys, index, renames, sentry_api.iter_client_keys, concurrency)
+		plan_client_keys(sentry_api, organization_slug, client_keys, current, waves)
+
+	if service_hooks:
+		current = list_project_resources(sentry_api, organization_slug, service_hooks, index, renames, sentry_api.iter_service_hooks, concurrency)
+		plan_service_hooks(sentry_api, organization_slug, service_hooks, current, waves)
+
+	return dict(
+		version=PLAN_VERSION,
+		created=int(time.time()),
+		sentry_host=sentry_api.host,
+		organization_slug=organization_slug,
+		waves=[wave for wave in waves if wave]
+	)
+
+
+def plan_summary(plan):
+	summary = dict(total=0, create=0, update=0, delete=0)
+
+	for wave in plan['waves']:
+		for op in wave:
+			summary['total'] += 1
+			summary[op['operation']] += 1
+
+	return summary
+
+
+def save_plan(path, plan):
+	# written next to its destination then renamed, a reader never sees half a plan
+	directory = os.path.dirname(os.path.abspath(path))
+	fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+	try:
+		with os.fdopen(fd, 'w') as plan_file:
+			json.dump(plan, plan_file, separators=(',', ':'), sort_keys=True)
+		os.replace(tmp_path, path)
+	except Exception:
+		try:
+			os.remove(tmp_path)
+		except OSError:
+			pass
+		raise
+
+
+def load_plan(path):
+	with open(path) as plan_file:
+		plan = json.load(plan_file)
+
+	if not isinstance(plan, dict) or plan.get('version') != PLAN_VERSION:
+		raise SentryApiError("%s is not a version %d Sentry plan" % (path, PLAN_VERSION))
+
+	for wave in plan.get('waves', []):
+		for op in wave:
+			methods = [op.get('method')] + ([op['then'].get('method')] if op.get('then') else [])
+
+			for method in methods:
+				if method not in PLAN_METHODS:
+					raise SentryApiError("%s calls an unknown method %s" % (path, method))
+
+	return plan
+
+
+def apply_operation(sentry_api, op):
+	result = getattr(sentry_api, op['method'])(**op['args'])
+
+	result['kind'] = op['kind']
+	result['target'] = op['target']
+	result['operation'] = op['operation']
+
+	if op['operation'] == 'delete' and result['status_code'] == 404:
+		# removed since the plan was made, the desired state is reached anyway
+		result['changed'] = False
+		result['message'] = "Already absent"
+		return result
+
+	if result['status_code'] != EXPECTED_STATUS_CODES[op['operation']]:
+		result['failed'] = True
+		return result
+
+	then = op.get('then')
+
+	if then and not sentry_api.check_mode:
+		args = dict(then['args'])
+		args[then['id_arg']] = result['response'][then['id_field']]
+
+		follow_up_result = getattr(sentry_api, then['method'])(**args)
+
+		if follow_up_result['status_code'] != EXPECTED_STATUS_CODES['update']:
+			follow_up_result['failed'] = True
+
+		result['then'] = follow_up_result
+		result['failed'] = follow_up_result.get('failed', False)
+
+	return result
+
+
+def apply_plan(sentry_api, plan, concurrency=DEFAULT_CONCURRENCY):
+	# run the waves in order, the operations of a wave in parallel. Once a wave
+	# has a failure the later ones are skipped, they may depend on it.
+	results = []
+
+	for wave in plan['waves']:
+		if any(result.get('failed') for result in results):
+			results.extend(
+				dict(changed=False, skipped=True, kind=op['kind'], target=op['target'], operation=op['operation'],
+					message="Skipped, an earlier wave failed")
+				for op in wave
+			)
+			continue
+
+		results.extend(run_concurrently(lambda op: apply_operation(sentry_api, op), wave, concurrency))
+
+	return results, summarize(results)
+
+
+def operation_graph(plan):
+	# The operations of a plan and, for each, the indexes of the operations it
+	# depends on. Finer than the waves: a project only waits for its own team and
+	# a hook for its own project, so unrelated branches don't wait for each other.
+	operations = [op for wave in plan['waves'] for op in wave]
+	teams = {}
+	projects = {}
+
+	for index, op in enumerate(operations):
+		final_slug = op['args'].get('slug') or op['target']
+
+		if op['operation'] != 'delete' and op['kind'] == 'team':
+			teams[final_slug] = index
+		elif op['operation'] != 'delete' and op['kind'] == 'project':
+			projects[final_slug] = index
+
+	requires = []
+
+	for op in operations:
+		required = set()
+
+		if op['kind'] == 'project' and op['operation'] != 'delete':
+			if op['args'].get('team_slug') in teams:
+				required.add(teams[op['args']['team_slug']])
+
+		elif op['kind'] in ('client_key', 'service_hook'):
+			if op['args']['project_slug'] in projects:
+				required.add(projects[op['args']['project_slug']])
+
+		if op['kind'] == 'project' and op['operation'] == 'delete':
+			# keys and hooks of the project go first
+			required.update(
+				index for index, other in enumerate(operations)
+				if other['kind'] in ('client_key', 'service_hook') and other['args']['project_slug'] == op['target']
+			)
+
+		elif op['kind'] == 'team' and op['operation'] == 'delete':
+			# projects leaving the team, deleted or moved, go first
+			required.update(
+				index for index, other in enumerate(operations)
+				if other['kind'] == 'project' and other.get('diff', {}).get('before', {}).get('team_slug') == op['target']
+			)
+
+		requires.append(sorted(required))
+
+	return operations, requires
+
+
+def apply_graph(sentry_api, plan, concurrency=DEFAULT_CONCURRENCY):
+	operations, requires = operation_graph(plan)
+	results = run_graph(lambda op: apply_operation(sentry_api, op), operations, requires, concurrency)
+
+	for op, result in zip(operations, results):
+		if result.get('skipped'):
+			result.update(kind=op['kind'], target=op['target'], operation=op['operation'])
+
+	return results, summarize(results)
+
+
+def desired_state_argument_spec():
+	# options describing the desired state of an organization, documented in the
+	# ridwanbejo.sentry.sentry.desired_state doc fragment
+	state = dict(default='present', choices=['present', 'absent'], type='str')
+
+	return dict(
+		organization_slug=dict(type='str', required=True),
+		teams=dict(
+			type='list',
+			elements='dict',
+			default=[],
+			options=dict(
+				team_slug=dict(type='str', required=False),
+				name=dict(type='str', required=False),
+				slug=dict(type='str', required=False),
+				state=state
+			),
+			required_one_of=[('team_slug', 'slug')]
+		),
+		projects=dict(
+			type='list',
+			elements='dict',
+			default=[],
+			options=dict(
+				project_slug=dict(type='str', required=False),
+				team_slug=dict(type='str', required=False),
+				name=dict(type='str', required=False),
+				slug=dict(type='str', required=False),
+				platform=dict(type='str', required=False),
+				is_bookmarked=dict(type='bool', required=False),
+				state=state
+			),
+			required_one_of=[('project_slug', 'slug')]
+		),
+		client_keys=dict(
+			type='list',
+			elements='dict',
+			default=[],
+			options=dict(
+				project_slug=dict(type='str', required=True),
+				name=dict(type='str', required=True),
+				is_active=dict(type='bool', required=False),
+				state=state
+			)
+		),
+		service_hooks=dict(
+			type='list',
+			elements='dict',
+			default=[],
+			options=dict(
+				project_slug=dict(type='str', required=True),
+				url=dict(type='str', required=True),
+				events=dict(type='list', elements='str', required=False),
+				state=state
+			)
+		),
+		concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+	)
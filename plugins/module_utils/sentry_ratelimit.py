@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class HostRateLimiter(object):
+	# Token bucket shared by every process calling the same Sentry host on this
+	# machine. The bucket lives in a small state file guarded by flock, so all the
+	# forks of a play running on the controller (or on one delegate host) draw
+	# from one budget of `rate` requests per second.
+
+	STATE_DIR = os.path.join(tempfile.gettempdir(), 'ansible-sentry-ratelimit')
+
+	def __init__(self, host, rate, burst=None, state_dir=None):
+		self.rate = float(rate)
+		self.burst = float(burst or max(1, rate))
+
+		state_dir = state_dir or self.STATE_DIR
+
+		if not os.path.isdir(state_dir):
+			try:
+				os.makedirs(state_dir, 0o700)
+			except OSError:
+				# another fork created it in the meantime
+				pass
+
+		key = hashlib.sha1(host.rstrip('/').encode('utf-8')).hexdigest()
+		self.state_path = os.path.join(state_dir, key + '.json')
+
+	def take(self):
+		# take one token, return how long to wait when none is available
+		with open(self.state_path, 'a+') as state_file:
+			fcntl.flock(state_file, fcntl.LOCK_EX)
+
+			try:
+				state_file.seek(0)
+				now = time.time()
+
+				try:
+					state = json.loads(state_file.read())
+					tokens = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate)
+				except (ValueError, KeyError, TypeError):
+					tokens = self.burst
+
+				wait = 0
+				if tokens >= 1:
+					tokens -= 1
+				else:
+					wait = (1 - tokens) / self.rate
+
+				state_file.seek(0)
+				state_file.truncate()
+				state_file.write(json.dumps(dict(tokens=tokens, updated=now)))
+				state_file.flush()
+			finally:
+				fcntl.flock(state_file, fcntl.LOCK_UN)
+
+		return wait
+
+	def acquire(self, sleep=time.sleep):
+		# sleep is given the wait, a caller with a deadline raises from it instead
+		# of waiting past it
+		while True:
+			wait = self.take()
+
+			if not wait:
+				return
+
+			sleep(wait)
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, DEFAULT_CONCURRENCY
+
+
+def prune_service_hooks(sentry_api, organization_slug, project_slug, hooks, keep, concurrency=DEFAULT_CONCURRENCY):
+	# delete every hook of the project but the declared one, duplicates of the
+	# declared URL included. The deletes don't depend on each other, a failed one
+	# doesn't stop the others.
+	def worker(hook):
+		result = sentry_api.delete_service_hook(organization_slug, project_slug, hook['id'], current=hook)
+
+		if result['status_code'] not in (204, 404):
+			result['failed'] = True
+
+		result['hook_id'] = hook['id']
+		result['hook_url'] = hook.get('url')
+
+		return result
+
+	return run_concurrently(worker, [hook for hook in hooks if hook['id'] != keep], concurrency)
+
+
+def reconcile_service_hook(sentry_api, organization_slug, project_slug, hook_url, hook_events, state='present', hook_id=None,
+							prune=False, concurrency=DEFAULT_CONCURRENCY):
+	# Converge one service hook of a project and return its result, marked failed
+	# instead of raising when a call fails. Without hook_id the hook is matched by
+	# URL, so running again finds the hook created by the first run instead of
+	# adding a duplicate. With hook_id the listed hook is compared, so an unchanged
+	# hook isn't sent. prune deletes the other hooks, returned in pruned.
+	hooks = []
+	current = None
+
+	if state == 'absent' and not hook_id and not hook_url:
+		raise SentryApiError("hook_id or hook_url is required to delete a service hook")
+
+	if hook_id or hook_url or prune:
+		hooks = list(sentry_api.iter_service_hooks(organization_slug, project_slug))
+
+		for hook in hooks:
+			if (hook_id and hook['id'] == hook_id) or (not hook_id and hook.get('url') == hook_url):
+				current = hook
+				hook_id = hook['id']
+				break
+
+	# a. if state is present then update the matching hook or create it, nothing
+	# is sent when the URL and the set of events already match
+	if state == 'present' and not hook_id:
+		operation, expected = 'create', 201
+		result = sentry_api.create_service_hook(organization_slug, project_slug, hook_url, hook_events)
+
+	elif state == 'present':
+		operation, expected = 'update', 200
+		result = sentry_api.update_service_hook(organization_slug, project_slug, hook_id, hook_url, hook_events, current=current)
+
+	# b. if state is absent then delete the matching hook, a missing hook is already converged
+	elif not hook_id:
+		operation, expected = None, None
+		result = dict(
+			changed=False,
+			message="Project Service Hook is already absent"
+		)
+
+	else:
+		operation, expected = 'delete', 204
+		result = sentry_api.delete_service_hook(organization_slug, project_slug, hook_id, current=current)
+
+	if expected is not None and result['status_code'] != expected:
+		result['failed'] = True
+		result['message'] = "Failed %s operation" % operation
+		return result
+
+	# c. if prune is enabled then delete the hooks which are not declared
+	if prune:
+		pruned = prune_service_hooks(sentry_api, organization_slug, project_slug, hooks, hook_id, concurrency)
+
+		if pruned:
+			result['changed'] = True
+			result['pruned'] = pruned
+
+		failed = [hook for hook in pruned if hook.get('failed')]
+
+		if failed:
+			result['failed'] = True
+			result['message'] = "Failed to prune %d service hook(s)" % len(failed)
+
+	return result
@@ -0,0 +1,28 @@
+#!/usr/bin/python
+
+from importlib.util import find_spec
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi
+
+
+HAS_REQUESTS = find_spec('requests') is not None
+
+
+# Connection pools kept for the lifetime of the controller process running the
+# plugins (action, lookup, inventory), so every item of a looped task reuses the
+# connection opened by the first one
+SESSIONS = {}
+
+
+def default_transport(transport):
+	# the transport chosen by the user, else the pooled one when requests is installed
+	return transport or ('requests' if HAS_REQUESTS else 'open_url')
+
+
+def get_session(host, pool_size):
+	key = (host, pool_size)
+
+	if key not in SESSIONS:
+		SESSIONS[key] = SentryApi.create_session(pool_size)
+
+	return SESSIONS[key]
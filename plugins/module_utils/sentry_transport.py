@@ -0,0 +1,166 @@
+#!/usr/bin/python
+
+import json
+import time
+
+from http.client import HTTPException
+
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
+from ansible.module_utils.urls import open_url
+
+
+class SentryTransportError(Exception):
+	# the call did not get an HTTP answer, sent tells whether it may have reached Sentry
+	def __init__(self, message, sent=True):
+		super(SentryTransportError, self).__init__(message)
+		self.sent = sent
+
+
+class SentryHeaders(dict):
+	# response headers with case-insensitive lookups, like requests' headers
+	def __init__(self, headers=None):
+		super(SentryHeaders, self).__init__((key.lower(), value) for key, value in (headers or {}).items())
+
+	def __getitem__(self, key):
+		return super(SentryHeaders, self).__getitem__(key.lower())
+
+	def __contains__(self, key):
+		return super(SentryHeaders, self).__contains__(key.lower())
+
+	def get(self, key, default=None):
+		return super(SentryHeaders, self).get(key.lower(), default)
+
+
+class SentryResponse(object):
+	# minimal HTTP response returned by every transport. ttfb (seconds until the
+	# status and headers came back) and size (bytes of the body) are filled by the
+	# transports which can measure them
+	def __init__(self, status_code, body=None, headers=None):
+		self.status_code = status_code
+		self.body = body
+		self.headers = SentryHeaders(headers)
+		self.ttfb = None
+		self.size = None
+
+	@classmethod
+	def from_text(cls, status_code, text, headers=None, ttfb=None, size=None):
+		try:
+			body = json.loads(text) if text else None
+		except ValueError:
+			body = text
+
+		response = cls(status_code, body, headers)
+		response.ttfb = ttfb
+		response.size = size
+
+		return response
+
+	def json(self):
+		return self.body
+
+
+# A transport is a session-like object: a `headers` dict sent with every call,
+# request(method, url, data, timeout) returning a SentryResponse and raising
+# SentryTransportError when no HTTP answer came back, and close().
+
+
+class OpenUrlSession(object):
+	# Default transport, built on Ansible's own open_url so the modules need
+	# nothing outside of the standard library. Every call opens its own connection.
+	def __init__(self):
+		self.headers = {}
+
+	def request(self, method, url, data=None, timeout=None):
+		# urllib has a single socket timeout covering the connection and each read,
+		# the read timeout is used for both
+		if isinstance(timeout, tuple):
+			timeout = timeout[1]
+
+		started = time.time()
+
+		try:
+			response = open_url(url, data=data, method=method, headers=dict(self.headers), timeout=timeout, follow_redirects='safe')
+		except HTTPError as e:
+			# 4xx and 5xx are answers for SentryApi to interpret
+			response = e
+		except URLError as e:
+			# raised while connecting or sending, Sentry never got the whole call
+			raise SentryTransportError(str(e.reason), sent=False)
+		except (HTTPException, OSError) as e:
+			raise SentryTransportError(str(e))
+
+		# open_url returns once the status and headers are read
+		ttfb = time.time() - started
+
+		try:
+			text = response.read()
+		except (HTTPException, OSError) as e:
+			raise SentryTransportError(str(e))
+
+		return SentryResponse.from_text(response.getcode(), text.decode('utf-8'), dict(response.headers.items()), ttfb=ttfb, size=len(text))
+
+	def close(self):
+		pass
+
+
+class RequestsSession(object):
+	# Transport keeping a pool of keep-alive connections, so consecutive calls to
+	# the same host reuse the open TCP/TLS connection instead of handshaking again.
+	# requests is only imported when this transport is chosen.
+	def __init__(self, pool_size):
+		import requests
+		from requests.adapters import HTTPAdapter
+
+		self.exceptions = requests.exceptions
+		self.session = requests.Session()
+
+		adapter = HTTPAdapter(
+			pool_connections=pool_size,
+			pool_maxsize=pool_size,
+			max_retries=0
+		)
+
+		self.session.mount('http://', adapter)
+		self.session.mount('https://', adapter)
+		self.session.headers['Connection'] = 'keep-alive'
+
+		self.headers = self.session.headers
+
+	def request(self, method, url, data=None, timeout=None):
+		try:
+			response = self.session.request(method, url, data=data, timeout=timeout)
+		except self.exceptions.RequestException as e:
+			raise SentryTransportError(str(e), sent=not isinstance(e, self.exceptions.ConnectTimeout))
+
+		# elapsed stops once the status and headers are parsed
+		return SentryResponse.from_text(
+			response.status_code,
+			response.text,
+			response.headers,
+			ttfb=response.elapsed.total_seconds(),
+			size=len(response.content)
+		)
+
+	def close(self):
+		self.session.close()
+
+
+class HttpApiSession(object):
+	# Transport sending SentryApi calls through the persistent connection of the
+	# ridwanbejo.sentry.sentry httpapi plugin. Host, TLS and authentication are
+	# owned by that connection, so URLs are plain API paths here.
+	def __init__(self, connection):
+		self.connection = connection
+		self.headers = {}
+
+	def request(self, method, url, data=None, timeout=None):
+		try:
+			response = self.connection.send_request(data, method=method, path=url, headers=dict(self.headers))
+		except ConnectionError as e:
+			raise SentryTransportError(str(e))
+
+		return SentryResponse.from_text(response['status_code'], response['body'], response['headers'], size=len(response['body'].encode('utf-8')))
+
+	def close(self):
+		pass
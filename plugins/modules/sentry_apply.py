@@ -0,0 +1,132 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_apply
+short_description: Execute a plan file written by sentry_plan.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module runs the create, update and delete calls of a plan written by M(ridwanbejo.sentry.sentry_plan)
+  - No read is needed to decide what to do, only the planned writes are sent
+  - The plan runs in waves ordered by dependency (teams, projects, client keys and service hooks, then project and team deletes). The calls of a wave run in parallel, and the later waves are skipped once a wave had a failure
+  - A delete whose object is already gone is reported unchanged. Changes made in Sentry since the plan was computed are not detected, plan again when in doubt
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  plan_path:
+    description:
+    - Path of the plan file written by M(ridwanbejo.sentry.sentry_plan)
+    type: path
+    required: true
+    version_added: 1.1.0
+  concurrency:
+    description:
+    - Maximum number of calls of a wave sent at the same time
+    type: int
+    default: 8
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Apply the plan saved by sentry_plan
+- name: Apply Sentry changes
+    ridwanbejo.sentry.sentry_apply:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      plan_path: 'sentry-plan.json'
+      concurrency: 16
+"""
+
+RETURN = r"""
+results:
+  description: Result of every executed operation, wave after wave
+  returned: always
+  type: list
+  elements: dict
+summary:
+  description: Number of changed, unchanged, failed and skipped operations
+  returned: always
+  type: dict
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import DEFAULT_CONCURRENCY
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_plan import apply_plan, load_plan
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        plan_path=dict(type='path', required=True),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    try:
+        plan = load_plan(params['plan_path'])
+    except (IOError, OSError, ValueError) as e:
+        raise SentryApiError("Can't read plan %s: %s" % (params['plan_path'], e))
+
+    # a plan made against another Sentry must not be replayed here
+    if plan.get('sentry_host') and sentry_api.host and plan['sentry_host'] != sentry_api.host:
+        raise SentryApiError("Plan %s was computed for %s, not %s" % (params['plan_path'], plan['sentry_host'], sentry_api.host))
+
+    results, summary = apply_plan(sentry_api, plan, params['concurrency'])
+
+    result = dict(
+        changed=summary['changed'] > 0,
+        results=results,
+        summary=summary
+    )
+
+    if summary['failed']:
+        result['failed'] = True
+        result['msg'] = "Failed to apply %d operation(s), %d skipped" % (summary['failed'], summary['skipped'])
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
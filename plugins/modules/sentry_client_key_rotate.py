@@ -0,0 +1,306 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_client_key_rotate
+short_description: Rotate the client keys of many projects in Sentry at once.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module will help you to rotate the client keys (DSN) of many projects in a single task
+  - A new key named I(name) is created in every project, then after I(grace_period) the other keys are deactivated or deleted
+  - A project which already has an active key named I(name) keeps it, so running the task again after a rotation doesn't create new keys
+  - Projects are handled concurrently by one shared client, so it is much faster than looping over M(ridwanbejo.sentry.sentry_project_client_key)
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+    version_added: 1.1.0
+  projects:
+    description:
+    - Slugs of the projects, or shell-style patterns such as C(backend-*) matched against the slugs of every project of the organization
+    type: list
+    elements: str
+    default: []
+    version_added: 1.1.0
+  team_slug:
+    description:
+    - Also rotate the keys of every project of this team
+    type: str
+    version_added: 1.1.0
+  name:
+    description:
+    - Name of the new client key, for example C(rotation-2022-q3)
+    type: str
+    required: true
+    version_added: 1.1.0
+  old_keys:
+    description:
+    - What happens to the other keys of the projects once the new keys exist
+    - C(deactivate) keeps them but rejects their events, C(delete) removes them and C(keep) leaves them untouched
+    type: str
+    default: 'deactivate'
+    choices: ['deactivate', 'delete', 'keep']
+    version_added: 1.1.0
+  grace_period:
+    description:
+    - Seconds to wait between the creation of the new keys and the retirement of the old ones, so the clients can pick up the new DSN
+    - Only waited when there are old keys to retire, and never in check mode
+    type: int
+    default: 0
+    version_added: 1.1.0
+  concurrency:
+    description:
+    - Maximum number of projects handled at the same time
+    type: int
+    default: 8
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Quarterly rotation of the keys of every backend project, the old keys are disabled 10 minutes later
+- name: Rotate Sentry client keys
+    ridwanbejo.sentry.sentry_client_key_rotate:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      projects:
+      - 'backend-*'
+      name: 'rotation-2022-q3'
+      old_keys: deactivate
+      grace_period: 600
+      concurrency: 16
+    register: rotation
+
+- name: Publish the new DSN of every project
+    ansible.builtin.copy:
+      content: "{{ rotation.dsns | to_nice_json }}"
+      dest: /etc/app/sentry-dsns.json
+"""
+
+RETURN = r"""
+dsns:
+  description:
+  - Public DSN of the new key of every project, by project slug
+  - In check mode the keys which would be created have no DSN yet and are null
+  returned: always
+  type: dict
+results:
+  description: Result of every project, with its C(project_slug), the new C(client_key) and the C(retired) keys
+  returned: always
+  type: list
+  elements: dict
+summary:
+  description: Number of changed, unchanged and failed projects
+  returned: always
+  type: dict
+grace_period:
+  description:
+  - The C(seconds) of the grace period, the number of C(old_keys) it delayed and whether it was C(waited)
+  - When I(task_timeout) can't fit it, the old keys are not retired and C(message) tells why
+  returned: when old keys had to wait for a grace period
+  type: dict
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, SentryApiDeadlineExceeded, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, resolve_projects, summarize, DEFAULT_CONCURRENCY
+
+
+def create_new_key(sentry_api, params, project_slug):
+    organization_slug = params['organization_slug']
+    keys = list(sentry_api.iter_client_keys(organization_slug, project_slug))
+    current = None
+
+    for key in keys:
+        if key.get('name') == params['name'] and key.get('isActive', True):
+            current = key
+            break
+
+    # a. a project already rotated to this name keeps its key
+    if current is not None:
+        result = dict(
+            changed=False,
+            message="Project Client Key already exists",
+            response=current
+        )
+
+    # b. otherwise create the new key
+    else:
+        result = sentry_api.create_client_key(organization_slug, project_slug, params['name'])
+
+        if result['status_code'] != 201:
+            result['failed'] = True
+
+        current = result.get('response') or {}
+
+    if params['old_keys'] == 'deactivate':
+        old_keys = [key for key in keys if key['id'] != current.get('id') and key.get('isActive', True)]
+    elif params['old_keys'] == 'delete':
+        old_keys = [key for key in keys if key['id'] != current.get('id')]
+    else:
+        old_keys = []
+
+    result['project_slug'] = project_slug
+    result['client_key'] = current.get('id')
+    result['dsn'] = (current.get('dsn') or {}).get('public')
+    result['old_keys'] = old_keys
+
+    return result
+
+
+def retire_old_key(sentry_api, params, project_slug, key):
+    if params['old_keys'] == 'deactivate':
+        result = sentry_api.update_client_key(params['organization_slug'], project_slug, key['id'], None, False, current=key)
+        expected_status_codes = (200,)
+    else:
+        result = sentry_api.delete_client_key(params['organization_slug'], project_slug, key['id'], current=key)
+        expected_status_codes = (204, 404)
+
+    if result['status_code'] not in expected_status_codes:
+        result['failed'] = True
+
+    return result
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        organization_slug=dict(type='str', required=True),
+        projects=dict(type='list', elements='str', default=[]),
+        team_slug=dict(type='str', required=False),
+        name=dict(type='str', required=True),
+        old_keys=dict(
+            default="deactivate",
+            choices=['deactivate', 'delete', 'keep'],
+            type='str',
+            no_log=False),
+        grace_period=dict(type='int', default=0),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    if not params['projects'] and not params['team_slug']:
+        raise SentryApiError("projects or team_slug is required")
+
+    project_slugs = resolve_projects(sentry_api, params['organization_slug'], params['projects'], params['team_slug'])
+
+    # 1. create the new key of every project
+    def create_worker(project_slug):
+        return create_new_key(sentry_api, params, project_slug)
+
+    results = run_concurrently(create_worker, project_slugs, params['concurrency'])
+
+    for project_slug, result in zip(project_slugs, results):
+        result.setdefault('project_slug', project_slug)
+
+    # 2. retire the old keys of the projects which have their new key, all the
+    # projects at once after a single grace period
+    retirements = [
+        (result, key)
+        for result in results if not result.get('failed')
+        for key in result.get('old_keys', [])
+    ]
+
+    # the wait counts against task_timeout like any other. When it can't fit, the
+    # new keys are still returned and the old ones are left in place
+    grace_period = None
+
+    if retirements and params['grace_period'] > 0 and not sentry_api.check_mode:
+        grace_period = dict(seconds=params['grace_period'], old_keys=len(retirements), waited=False)
+
+        try:
+            sentry_api.wait(params['grace_period'], "for the grace period before retiring %d old client key(s)" % len(retirements))
+            grace_period['waited'] = True
+        except SentryApiDeadlineExceeded as e:
+            grace_period['message'] = str(e)
+            retirements = []
+
+    def retire_worker(retirement):
+        result, key = retirement
+        return retire_old_key(sentry_api, params, result['project_slug'], key)
+
+    retired = run_concurrently(retire_worker, retirements, params['concurrency'])
+
+    for result in results:
+        result['retired'] = []
+        result.pop('old_keys', None)
+
+    for (result, key), retire_result in zip(retirements, retired):
+        result['retired'].append(key['id'])
+
+        if retire_result.get('changed'):
+            result['changed'] = True
+
+        if retire_result.get('failed'):
+            result['failed'] = True
+            result['message'] = "Failed to retire client key %s: %s" % (key['id'], retire_result.get('message'))
+
+    summary = summarize(results)
+
+    result = dict(
+        changed=summary['changed'] > 0,
+        dsns=dict((result['project_slug'], result.get('dsn')) for result in results),
+        results=results,
+        summary=summary
+    )
+
+    if grace_period is not None:
+        result['grace_period'] = grace_period
+
+    if summary['failed']:
+        result['failed'] = True
+        result['msg'] = "Failed to rotate the client keys of %d project(s)" % summary['failed']
+    elif grace_period is not None and not grace_period['waited']:
+        result['failed'] = True
+        result['msg'] = "New client keys created, the old ones were not retired: %s" % grace_period['message']
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_info
+short_description: Gather facts about an organization in Sentry, its teams, projects, client keys and service hooks.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module will help you to audit an organization in a single read-only task
+  - The organization, its teams and its projects are read concurrently, then the client keys and service hooks of every project, also concurrently, by one shared client
+  - Objects are returned with a small set of snake_case fields, which I(fields) can narrow down
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+    version_added: 1.1.0
+  projects:
+    description:
+    - Only return the projects whose slug matches one of these slugs or shell-style patterns such as C(backend-*)
+    - Defaults to every project of the organization
+    type: list
+    elements: str
+    default: []
+    version_added: 1.1.0
+  include:
+    description:
+    - Per-project details to gather as well, each costs one listing per project
+    type: list
+    elements: str
+    default: []
+    choices: ['client_keys', 'service_hooks']
+    version_added: 1.1.0
+  fields:
+    description:
+    - Fields to keep, by section (C(organization), C(teams), C(projects), C(client_keys), C(service_hooks))
+    - A section which is not given keeps all its fields, see RETURN
+    type: dict
+    default: {}
+    version_added: 1.1.0
+  concurrency:
+    description:
+    - Maximum number of requests running at the same time
+    type: int
+    default: 8
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Audit the DSN and the hooks of every backend project
+- name: Gather Sentry facts
+    ridwanbejo.sentry.sentry_info:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      projects:
+      - 'backend-*'
+      include:
+      - client_keys
+      - service_hooks
+      fields:
+        projects: ['slug', 'team_slug', 'client_keys', 'service_hooks']
+        client_keys: ['name', 'dsn']
+    register: sentry_info
+
+- name: Projects without service hook
+    debug:
+      msg: "{{ sentry_info.projects | rejectattr('service_hooks') | map(attribute='slug') | list }}"
+"""
+
+RETURN = r"""
+organization:
+  description: The organization, with C(id), C(slug), C(name) and C(date_created)
+  returned: always
+  type: dict
+teams:
+  description: Teams of the organization, with C(id), C(slug), C(name) and C(member_count)
+  returned: always
+  type: list
+  elements: dict
+projects:
+  description:
+  - Projects of the organization, with C(id), C(slug), C(name), C(platform), C(team_slug), C(is_bookmarked) and C(date_created)
+  - With I(include), also C(client_keys) (C(id), C(name), C(is_active), C(dsn)) and C(service_hooks) (C(id), C(url), C(events), C(status))
+  returned: always
+  type: list
+  elements: dict
+"""
+
+from fnmatch import fnmatchcase
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi, SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, DEFAULT_CONCURRENCY
+
+
+# returned field -> path of the field in the Sentry response, or the function
+# reading it, by section
+INFO_FIELDS = {
+    'organization': {
+        'id': 'id',
+        'slug': 'slug',
+        'name': 'name',
+        'date_created': 'dateCreated'
+    },
+    'teams': {
+        'id': 'id',
+        'slug': 'slug',
+        'name': 'name',
+        'member_count': 'memberCount'
+    },
+    'projects': {
+        'id': 'id',
+        'slug': 'slug',
+        'name': 'name',
+        'platform': 'platform',
+        'team_slug': SentryApi.project_team_slug,
+        'is_bookmarked': 'isBookmarked',
+        'date_created': 'dateCreated'
+    },
+    # client_key_dsns already returns them normalized
+    'client_keys': {
+        'id': 'id',
+        'name': 'name',
+        'is_active': 'is_active',
+        'dsn': 'dsn'
+    },
+    'service_hooks': {
+        'id': 'id',
+        'url': 'url',
+        'events': 'events',
+        'status': 'status'
+    }
+}
+
+
+def normalize(obj, section, fields):
+    selected = fields.get(section)
+
+    return dict(
+        (name, path(obj) if callable(path) else SentryApi.get_field(obj, path))
+        for name, path in INFO_FIELDS[section].items()
+        if selected is None or name in selected
+    )
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        organization_slug=dict(type='str', required=True),
+        projects=dict(type='list', elements='str', default=[]),
+        include=dict(type='list', elements='str', default=[], choices=['client_keys', 'service_hooks']),
+        fields=dict(type='dict', default={}),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    organization_slug = params['organization_slug']
+    fields = params['fields']
+
+    unknown = sorted(set(fields) - set(INFO_FIELDS))
+    if unknown:
+        raise SentryApiError("Unknown fields section(s): %s" % ", ".join(unknown))
+
+    # 1. the organization, its teams and its projects don't depend on each other
+    def retrieve_organization():
+        result = sentry_api.retrieve_organization(organization_slug)
+
+        if result['status_code'] != 200:
+            raise SentryApiError.from_result(result['message'], result)
+
+        return result['response']
+
+    readers = dict(
+        organization=retrieve_organization,
+        teams=lambda: list(sentry_api.iter_teams(organization_slug)),
+        projects=lambda: list(sentry_api.iter_projects(organization_slug))
+    )
+    sections = sorted(readers)
+
+    def read_section(section):
+        return dict(data=readers[section]())
+
+    read = dict(zip(sections, run_concurrently(read_section, sections, params['concurrency'])))
+
+    for section in sections:
+        if read[section].get('failed'):
+            raise SentryApiError("Failed to read the %s of %s: %s" % (section, organization_slug, read[section]['message']))
+
+    projects = read['projects']['data']
+
+    if params['projects']:
+        projects = [
+            project for project in projects
+            if any(fnmatchcase(project['slug'], pattern) for pattern in params['projects'])
+        ]
+
+    result = dict(
+        changed=False,
+        organization=normalize(read['organization']['data'], 'organization', fields),
+        teams=[normalize(team, 'teams', fields) for team in read['teams']['data']],
+        projects=[normalize(project, 'projects', fields) for project in projects]
+    )
+
+    # 2. the keys and hooks of every project, all the listings at once
+    listers = dict(
+        client_keys=sentry_api.client_key_dsns,
+        service_hooks=lambda organization_slug, project_slug: list(sentry_api.iter_service_hooks(organization_slug, project_slug))
+    )
+    listings = [
+        (index, project['slug'], section)
+        for index, project in enumerate(projects)
+        for section in params['include']
+    ]
+
+    def list_details(listing):
+        index, project_slug, section = listing
+        return dict(data=listers[section](organization_slug, project_slug))
+
+    for (index, project_slug, section), listed in zip(listings, run_concurrently(list_details, listings, params['concurrency'])):
+        if listed.get('failed'):
+            raise SentryApiError("Failed to list the %s of %s: %s" % (section, project_slug, listed['message']))
+
+        if 'projects' not in fields or section in fields['projects']:
+            result['projects'][index][section] = [normalize(item, section, fields) for item in listed['data']]
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_org_state
+short_description: Converge the teams, projects, client keys and service hooks of an organization to a declared state in one task.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module takes the whole tree of an organization (teams, their projects, and the client keys and service hooks of the projects) and makes Sentry match it
+  - The needed changes are computed from listings like M(ridwanbejo.sentry.sentry_plan) does, then run as a dependency graph. A project waits for its team, keys and hooks wait for their project, deletes go children first, and everything independent runs concurrently
+  - When a change fails, the changes depending on it are skipped and reported, the other branches still run
+  - Replaces playbooks sequencing M(ridwanbejo.sentry.sentry_team), M(ridwanbejo.sentry.sentry_project), M(ridwanbejo.sentry.sentry_project_client_key) and M(ridwanbejo.sentry.sentry_project_service_hook) by hand
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+    - ridwanbejo.sentry.sentry.desired_state
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Bootstrap an organization in a single task
+- name: Converge Sentry organization
+    ridwanbejo.sentry.sentry_org_state:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      concurrency: 16
+      teams:
+      - name: 'Backend Team'
+        slug: 'backend-team'
+      - name: 'Frontend Team'
+        slug: 'frontend-team'
+      projects:
+      - name: 'Bonjour'
+        slug: 'bonjour'
+        team_slug: 'backend-team'
+        platform: 'python'
+      - name: 'Selamat Pagi'
+        slug: 'selamat-pagi'
+        team_slug: 'frontend-team'
+        platform: 'javascript'
+      client_keys:
+      - project_slug: 'bonjour'
+        name: 'Production'
+      - project_slug: 'selamat-pagi'
+        name: 'Production'
+      service_hooks:
+      - project_slug: 'bonjour'
+        url: 'https://hooks.example.com/sentry'
+        events: ['event.alert']
+"""
+
+RETURN = r"""
+results:
+  description: Result of every change, with its C(kind), C(target) and C(operation). Changes skipped because a dependency failed carry C(skipped)
+  returned: always
+  type: list
+  elements: dict
+summary:
+  description: Number of changed, unchanged, failed and skipped changes
+  returned: always
+  type: dict
+planned:
+  description: Number of changes computed, in total and by create, update and delete
+  returned: always
+  type: dict
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_plan import build_plan, plan_summary, apply_graph, desired_state_argument_spec
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True)
+    )
+
+    module_args.update(desired_state_argument_spec())
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    plan = build_plan(
+        sentry_api,
+        params['organization_slug'],
+        params['teams'],
+        params['projects'],
+        params['client_keys'],
+        params['service_hooks'],
+        params['concurrency']
+    )
+
+    results, summary = apply_graph(sentry_api, plan, params['concurrency'])
+
+    result = dict(
+        changed=summary['changed'] > 0,
+        results=results,
+        summary=summary,
+        planned=plan_summary(plan)
+    )
+
+    if summary['failed']:
+        result['failed'] = True
+        result['msg'] = "Failed to apply %d change(s), %d skipped" % (summary['failed'], summary['skipped'])
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
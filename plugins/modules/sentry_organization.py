@@ -22,12 +22,14 @@ options:
   sentry_host:
     description:
     - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
   sentry_token:
     description:
     - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
@@ -55,10 +57,12 @@ options:
     default: 'present'
     choices: [present']
     type: str
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
 requirements:
     - "python >= 3.8.10"
     - "ansible >= 2.12.1"
-    - "requests >= 2.26.0"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
 """
 
 EXAMPLES = r"""
@@ -107,14 +111,11 @@ msg:
        sample: 48
 """
 
-import requests
-import json
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi
 
-
-def run_module():
+def argument_spec():
     module_args = dict(
         sentry_host=dict(type='str', require=True),
         sentry_token=dict(type='str', require=True),
@@ -127,44 +128,41 @@ def run_module():
             type='str')
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
+    module_args.update(sentry_argument_spec())
+
+    return module_args
 
-    if module.check_mode:
-        module.exit_json(dict(
-            changed=False,
-            message='Check mode success!'
-        ))
 
+def run_task(sentry_api, params):
     result = dict(
     )
 
-    sentry_api = SentryApi(module, module.params['sentry_host'], module.params['sentry_token'])
-
     # a. if state is present then check the existence of organization
-    if module.params['state'] == "present":
+    if params['state'] == "present":
 
         # a.1. if the organization is not exist then create new organization
         retrieve_requests = sentry_api.retrieve_organization(
-            module.params['organization_slug']
+            params['organization_slug']
         )
 
         if retrieve_requests['status_code'] == 200:
             result = sentry_api.update_organization(
-                module.params['organization_slug'],
-                module.params['name'],
-                module.params['slug'],
+                params['organization_slug'],
+                params['name'],
+                params['slug'],
+                current=retrieve_requests['response']
             )
 
             if result['status_code'] != 200:
-                module.fail_json(msg=result)
+                raise SentryApiError.from_result(result['message'], result)
         else:
-            result = retrieve_requests
-            module.fail_json(msg=result)
+            raise SentryApiError.from_result(retrieve_requests['message'], retrieve_requests)
+
+    return result
 
-    module.exit_json(**result)
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
 
 
 def main():
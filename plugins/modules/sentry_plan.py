@@ -0,0 +1,149 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_plan
+short_description: Compute the changes needed to reach a desired state of teams, projects, client keys and service hooks, and save them to a plan file.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module compares a desired state with live Sentry and writes the minimal list of create, update and delete calls to a JSON plan file
+  - Only reads are sent to Sentry, using listings (one for teams, one for projects and one per project whose keys or hooks are managed)
+  - The plan is executed later by M(ridwanbejo.sentry.sentry_apply), for example planning in CI and applying in the change window
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  plan_path:
+    description:
+    - Path of the plan file to write. It is replaced atomically
+    - In check mode the plan is computed and returned but not written
+    type: path
+    required: true
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+    - ridwanbejo.sentry.sentry.desired_state
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Plan the changes of a release and save them for a later apply
+- name: Plan Sentry changes
+    ridwanbejo.sentry.sentry_plan:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      plan_path: 'sentry-plan.json'
+      teams:
+      - name: 'Backend Team'
+        slug: 'backend-team'
+      projects:
+      - name: 'Bonjour'
+        slug: 'bonjour'
+        team_slug: 'backend-team'
+        platform: 'python'
+      client_keys:
+      - project_slug: 'bonjour'
+        name: 'Production'
+      service_hooks:
+      - project_slug: 'bonjour'
+        url: 'https://hooks.example.com/sentry'
+        events: ['event.alert']
+"""
+
+RETURN = r"""
+plan_path:
+  description: Path of the plan file
+  returned: always
+  type: str
+summary:
+  description: Number of planned operations, in total and by create, update and delete
+  returned: always
+  type: dict
+waves:
+  description: Planned operations grouped in waves, every operation of a wave can run in parallel once the previous waves are done
+  returned: always
+  type: list
+  elements: list
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_plan import build_plan, plan_summary, save_plan, desired_state_argument_spec
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        plan_path=dict(type='path', required=True)
+    )
+
+    module_args.update(desired_state_argument_spec())
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    plan = build_plan(
+        sentry_api,
+        params['organization_slug'],
+        params['teams'],
+        params['projects'],
+        params['client_keys'],
+        params['service_hooks'],
+        params['concurrency']
+    )
+
+    summary = plan_summary(plan)
+
+    # planning itself only reads, the plan file is its one write
+    if not sentry_api.check_mode:
+        try:
+            save_plan(params['plan_path'], plan)
+        except (IOError, OSError) as e:
+            raise SentryApiError("Can't write plan to %s: %s" % (params['plan_path'], e))
+
+    return dict(
+        changed=summary['total'] > 0,
+        message="%d operation(s) planned" % summary['total'],
+        plan_path=params['plan_path'],
+        summary=summary,
+        waves=plan['waves']
+    )
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -22,12 +22,14 @@ options:
   sentry_host:
     description:
     - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
   sentry_token:
     description:
     - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
@@ -46,6 +48,7 @@ options:
   client_key:
     description:
     - chosen client key for update and delete operation
+    - When not set, the key is looked up by I(name) in the project's keys. A matching key is updated or deleted, and a new key is only created when none matches, so running the task again doesn't add duplicates
     type: str
     default: false
     version_added: 1.0.0
@@ -67,14 +70,16 @@ options:
     default: 'present'
     choices: [present', 'absent']
     type: str
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
 requirements:
     - "python >= 3.8.10"
     - "ansible >= 2.12.1"
-    - "requests >= 2.26.0"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
 """
 
 EXAMPLES = r"""
-# Create new project client key in Sentry
+# Create new project client key in Sentry, or update the key named default_key when it already exists
 - name: Test Sentry Client Key module - create client key
     ridwanbejo.sentry.sentry_project_client_key:
       sentry_host: "http://localhost:9000"
@@ -113,14 +118,11 @@ EXAMPLES = r"""
 RETURN = r"""
 """
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
 
-import requests
-import json
 
-
-def run_module():
+def argument_spec():
     module_args = dict(
         sentry_host=dict(type='str', require=True),
         sentry_token=dict(type='str', require=True),
@@ -135,61 +137,106 @@ def run_module():
             type='str')
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
+    module_args.update(sentry_argument_spec())
+
+    return module_args
 
-    if module.check_mode:
-        module.exit_json(dict(
-            changed=False,
-            message='Check mode success!'
-        ))
 
+def run_task(sentry_api, params):
     result = dict(
     )
 
-    sentry_api = SentryApi(module, module.params['sentry_host'], module.params['sentry_token'])
+    client_key = params['client_key']
+    current = None
+
+    # without client_key the key is looked up by name, so running the task again
+    # finds the key created by the first run instead of adding a duplicate.
+    # With client_key the listed key is compared, so an unchanged key isn't sent
+    if client_key or params['name']:
+        current = sentry_api.find_client_key(
+            params['organization_slug'],
+            params['project_slug'],
+            name=params['name'],
+            client_key_id=client_key
+        )
+
+        if current is not None:
+            client_key = current['id']
 
     # a. if state is present then check the existence of client key
-    if module.params['state'] == "present":
+    if params['state'] == "present":
 
-        # a.1. if the client key is provided
-        if (module.params['client_key'] == "") or (module.params['client_key'] is None):
+        # a.1. if the client key doesn't exist then create it
+        if not client_key:
             result = sentry_api.create_client_key(
-                module.params['organization_slug'],
-                module.params['project_slug'],
-                module.params['name']
+                params['organization_slug'],
+                params['project_slug'],
+                params['name']
             )
 
             if result['status_code'] != 201:
-                module.fail_json(dict(message="Failed create operation", status_code=result['status_code'], detail=result['response']))
+                raise SentryApiError.from_result("Failed create operation", result)
+
+            # a key is always created active, deactivate it right away when asked.
+            # In check mode the key has no id yet, the deactivation only shows in the diff
+            if params['is_active'] is False and sentry_api.check_mode:
+                result['diff']['after']['isActive'] = False
+
+            elif params['is_active'] is False:
+                follow_up = sentry_api.update_client_key(
+                    params['organization_slug'],
+                    params['project_slug'],
+                    result['response']['id'],
+                    None,
+                    False,
+                    current=result['response']
+                )
 
-        # a.2. if the client key is not provided
+                if follow_up['status_code'] != 200:
+                    raise SentryApiError.from_result("Failed update operation", follow_up)
+
+                sentry_api.follow_up_result(result, follow_up)
+
+        # a.2. if the client key exists then update it, nothing is sent when it already matches
         else:
             result = sentry_api.update_client_key(
-                module.params['organization_slug'],
-                module.params['project_slug'],
-                module.params['client_key'],
-                module.params['name'],
-                module.params['is_active']
+                params['organization_slug'],
+                params['project_slug'],
+                client_key,
+                params['name'],
+                params['is_active'],
+                current=current
             )
 
             if result['status_code'] != 200:
-                module.fail_json(dict(message="Failed update operation", status_code=result['status_code'], detail=result['response']))
-            
+                raise SentryApiError.from_result("Failed update operation", result)
+
     # b. if state is absent then delete the client key
-    elif module.params['state'] == "absent":
+    elif params['state'] == "absent":
+        if not client_key and not params['name']:
+            raise SentryApiError("client_key or name is required to delete a client key")
+
+        if not client_key:
+            return dict(
+                changed=False,
+                message="Project Client Key is already absent"
+            )
+
         result = sentry_api.delete_client_key(
-            module.params['organization_slug'],
-            module.params['project_slug'],
-            module.params['client_key']
+            params['organization_slug'],
+            params['project_slug'],
+            client_key,
+            current=current
         )
 
         if result['status_code'] != 204:
-            module.fail_json(dict(message="Failed delete operation", status_code=result['status_code'], detail=result['response']))
+            raise SentryApiError.from_result("Failed delete operation", result)
+
+    return result
 
-    module.exit_json(**result)
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
 
 
 def main():
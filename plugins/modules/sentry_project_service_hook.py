@@ -22,12 +22,14 @@ options:
   sentry_host:
     description:
     - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
   sentry_token:
     description:
     - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
@@ -46,6 +48,7 @@ options:
   hook_id:
     description:
     - new name for service hook
+    - When not set, the hook is looked up by I(hook_url) in the project's hooks. A matching hook is updated (only when its events differ, in any order) or deleted, and a new hook is only created when none matches, so running the task again doesn't add duplicates
     type: str
     default: false
     version_added: 1.0.0
@@ -61,16 +64,26 @@ options:
     type: list
     default: false
     version_added: 1.0.0
+  prune:
+    description:
+    - Delete every other hook of the project, including duplicates of I(hook_url), so the declared hook is the only one left
+    - With I(state=absent) every hook of the project is deleted
+    - The deleted hooks are returned in C(pruned)
+    type: bool
+    default: false
+    version_added: 1.1.0
   state:
     description:
       - Perform operation to create, update and delete project service hook in Sentry
     default: 'present'
     choices: [present', 'absent']
     type: str
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
 requirements:
     - "python >= 3.8.10"
     - "ansible >= 2.12.1"
-    - "requests >= 2.26.0"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
 """
 
 EXAMPLES = r"""
@@ -87,6 +100,20 @@ EXAMPLES = r"""
       - event.created
       state: present
 
+# Make the hook of example.com the only hook of the project, running it again changes nothing
+- name: Test Sentry service hook module - converge service hook
+    ridwanbejo.sentry.sentry_project_service_hook:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      project_slug: 'selamat-sore'
+      organization_slug: 'sentry'
+      hook_url: 'https://example.com/sentry_hook/'
+      hook_events:
+      - event.created
+      - event.alert
+      prune: true
+      state: present
+
 # Update project which has slug bonjour in Sentry with new slug and name
 - name: Test Sentry service hook module - update service hook
     ridwanbejo.sentry.sentry_project_service_hook:
@@ -114,14 +141,12 @@ EXAMPLES = r"""
 RETURN = r"""
 """
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi
-
-import requests
-import json
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_service_hook import reconcile_service_hook
 
 
-def run_module():
+def argument_spec():
     module_args = dict(
         sentry_host=dict(type='str', require=True),
         sentry_token=dict(type='str', require=True),
@@ -130,68 +155,40 @@ def run_module():
         hook_id=dict(type='str', required=False),
         hook_url=dict(type='str', required=False),
         hook_events=dict(type='list', required=False),
+        prune=dict(type='bool', default=False),
         state=dict(
             default="present", 
             choices=['present', 'absent'],  
             type='str')
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
+    module_args.update(sentry_argument_spec())
 
-    if module.check_mode:
-        module.exit_json(dict(
-            changed=False,
-            message='Check mode success!'
-        ))
+    return module_args
 
-    result = dict(
+
+def run_task(sentry_api, params):
+    result = reconcile_service_hook(
+        sentry_api,
+        params['organization_slug'],
+        params['project_slug'],
+        params['hook_url'],
+        params['hook_events'],
+        state=params['state'],
+        hook_id=params['hook_id'],
+        prune=params['prune']
     )
 
-    sentry_api = SentryApi(module, module.params['sentry_host'], module.params['sentry_token'])
-
-    # a. if state is present then check the existence of hook
-    if module.params['state'] == "present":
-
-        # a.1. if the hook_id is provided
-        if (module.params['hook_id'] == "") or (module.params['hook_id'] is None):
-            result = sentry_api.create_service_hook(
-                module.params['organization_slug'],
-                module.params['project_slug'],
-                module.params['hook_url'],
-                module.params['hook_events']
-            )
-
-            if result['status_code'] != 201:
-                module.fail_json(dict(message="Failed create operation", status_code=result['status_code'], detail=result['response']))
-
-        # a.2. if the hook_id is not provided
-        else:
-            result = sentry_api.update_service_hook(
-                module.params['organization_slug'],
-                module.params['project_slug'],
-                module.params['hook_id'],
-                module.params['hook_url'],
-                module.params['hook_events']
-            )
-
-            if result['status_code'] != 200:
-                module.fail_json(dict(message="Failed update operation", status_code=result['status_code'], detail=result['response']))
-
-    # b. if state is absent then delete the client key
-    elif module.params['state'] == "absent":
-        result = sentry_api.delete_service_hook(
-            module.params['organization_slug'],
-            module.params['project_slug'],
-            module.params['hook_id']
-        )
-
-        if result['status_code'] != 204:
-            module.fail_json(dict(message="Failed delete operation", status_code=result['status_code'], detail=result['response']))
-
-    module.exit_json(**result)
+    # report the call which failed, the first failed prune when the hook itself converged
+    if result.get('failed'):
+        failed = [hook for hook in result.get('pruned', []) if hook.get('failed')]
+        raise SentryApiError.from_result(result['message'], failed[0] if failed else result)
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
 
 
 def main():
@@ -0,0 +1,205 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_project_service_hooks
+short_description: Roll out one service hook to many projects in Sentry at once.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module will help you to attach the same service hook to many projects in a single task
+  - Each project is handled like M(ridwanbejo.sentry.sentry_project_service_hook) without I(hook_id). The hook is matched by URL, updated only when its events differ and created only when missing
+  - Projects are handled concurrently by one shared client, so it is much faster than looping over M(ridwanbejo.sentry.sentry_project_service_hook)
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+    version_added: 1.1.0
+  projects:
+    description:
+    - Slugs of the projects, or shell-style patterns such as C(backend-*) matched against the slugs of every project of the organization
+    - Patterns cost one listing of the organization's projects, plain slugs none
+    type: list
+    elements: str
+    default: []
+    version_added: 1.1.0
+  team_slug:
+    description:
+    - Also handle every project of this team
+    type: str
+    version_added: 1.1.0
+  hook_url:
+    description:
+    - URL for service hook target
+    type: str
+    required: true
+    version_added: 1.1.0
+  hook_events:
+    description:
+    - list events that trigger service hook
+    type: list
+    elements: str
+    version_added: 1.1.0
+  prune:
+    description:
+    - Delete every other hook of each project, including duplicates of I(hook_url), like the I(prune) option of M(ridwanbejo.sentry.sentry_project_service_hook)
+    type: bool
+    default: false
+    version_added: 1.1.0
+  state:
+    description:
+    - Whether the hook should exist on the projects or not
+    default: 'present'
+    choices: ['present', 'absent']
+    type: str
+    version_added: 1.1.0
+  concurrency:
+    description:
+    - Maximum number of projects handled at the same time
+    type: int
+    default: 8
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Attach the alerting webhook to every backend project and to the projects of the platform team
+- name: Roll out Sentry service hook
+    ridwanbejo.sentry.sentry_project_service_hooks:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      projects:
+      - 'backend-*'
+      - 'selamat-sore'
+      team_slug: 'platform-team'
+      hook_url: 'https://example.com/sentry_hook/'
+      hook_events:
+      - event.alert
+      - event.created
+      concurrency: 16
+"""
+
+RETURN = r"""
+results:
+  description:
+  - Result of every project, with its C(project_slug)
+  - With I(prune) the delete of every other hook of the project is returned in C(pruned), with its C(hook_id) and C(hook_url)
+  returned: always
+  type: list
+  elements: dict
+summary:
+  description: Number of changed, unchanged and failed projects
+  returned: always
+  type: dict
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, resolve_projects, summarize, DEFAULT_CONCURRENCY
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_service_hook import reconcile_service_hook
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        organization_slug=dict(type='str', required=True),
+        projects=dict(type='list', elements='str', default=[]),
+        team_slug=dict(type='str', required=False),
+        hook_url=dict(type='str', required=True),
+        hook_events=dict(type='list', elements='str', required=False),
+        prune=dict(type='bool', default=False),
+        state=dict(
+            default="present",
+            choices=['present', 'absent'],
+            type='str'),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    if not params['projects'] and not params['team_slug']:
+        raise SentryApiError("projects or team_slug is required")
+
+    project_slugs = resolve_projects(sentry_api, params['organization_slug'], params['projects'], params['team_slug'])
+
+    def worker(project_slug):
+        result = reconcile_service_hook(
+            sentry_api,
+            params['organization_slug'],
+            project_slug,
+            params['hook_url'],
+            params['hook_events'],
+            state=params['state'],
+            prune=params['prune'],
+            concurrency=params['concurrency']
+        )
+        result['project_slug'] = project_slug
+
+        return result
+
+    results = run_concurrently(worker, project_slugs, params['concurrency'])
+
+    # a worker which raised doesn't know its project
+    for project_slug, result in zip(project_slugs, results):
+        result.setdefault('project_slug', project_slug)
+
+    summary = summarize(results)
+
+    result = dict(
+        changed=summary['changed'] > 0,
+        results=results,
+        summary=summary
+    )
+
+    if summary['failed']:
+        result['failed'] = True
+        result['msg'] = "Failed to roll out the service hook to %d project(s)" % summary['failed']
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
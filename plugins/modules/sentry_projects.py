@@ -0,0 +1,299 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2022, Ridwan Fadjar Septian <ridwanbejo@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+
+
+DOCUMENTATION = r"""
+module: sentry_projects
+short_description: Reconcile many projects in Sentry at once. Every project is created, updated or deleted to match the desired list.
+author:
+    - "ridwanbejo (@ridwanbejo)"
+description:
+  - Based on Sentry API documentation (https://docs.sentry.io/api/), this module will help you to manage a list of projects in a single task
+  - Projects are reconciled concurrently by one shared client (one connection pool with I(transport=requests)), so it is much faster than looping over M(ridwanbejo.sentry.sentry_project)
+options:
+  sentry_host:
+    description:
+    - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  sentry_token:
+    description:
+    - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
+    type: str
+    version_added: 1.1.0
+  organization_slug:
+    description:
+    - Slug of the organization
+    type: str
+    required: true
+    version_added: 1.1.0
+  projects:
+    description:
+    - Desired projects. Each item accepts the same options as M(ridwanbejo.sentry.sentry_project)
+    type: list
+    elements: dict
+    required: true
+    version_added: 1.1.0
+    suboptions:
+      project_slug:
+        description:
+        - slug of the existing project. Defaults to I(slug)
+        type: str
+      team_slug:
+        description:
+        - slug of the team which owns the project. Required to create a project
+        type: str
+      name:
+        description:
+        - name for the project
+        type: str
+      slug:
+        description:
+        - slug for the project
+        type: str
+      platform:
+        description:
+        - Platform for the project
+        type: str
+      is_bookmarked:
+        description:
+        - Bookmark the project
+        type: bool
+      state:
+        description:
+        - Whether the project should exist or not
+        default: 'present'
+        choices: ['present', 'absent']
+        type: str
+  prefetch:
+    description:
+    - List all projects of the organization once (a few paged requests) and decide create, update or delete from that listing instead of retrieving every project
+    - Disable it when only a handful of projects from a very large organization are managed
+    type: bool
+    default: true
+    version_added: 1.1.0
+  concurrency:
+    description:
+    - Maximum number of projects reconciled at the same time
+    type: int
+    default: 8
+    version_added: 1.1.0
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
+requirements:
+    - "python >= 3.8.10"
+    - "ansible >= 2.12.1"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
+"""
+
+EXAMPLES = r"""
+# Make sure a set of projects exists in Sentry
+- name: Reconcile Sentry projects
+    ridwanbejo.sentry.sentry_projects:
+      sentry_host: "http://localhost:9000"
+      sentry_token: "8702e9c2d5224b60b24d2f7a9fa486f0eaaee9748a0e4acda3ea8febdc790093"
+      organization_slug: 'sentry'
+      concurrency: 16
+      projects:
+      - name: 'Bonjour'
+        slug: 'bonjour'
+        team_slug: 'sentry'
+        platform: 'python'
+      - name: 'Selamat Pagi'
+        slug: 'selamat-pagi'
+        team_slug: 'sentry'
+      - project_slug: 'old-project'
+        state: absent
+"""
+
+RETURN = r"""
+results:
+  description:
+  - Result of every project, in the same order as I(projects)
+  - Changed items carry C(operation) (create, update or delete) and updates a per-field C(diff). In check mode nothing is written and they describe the planned operations
+  - A create followed by the update of I(platform) or I(is_bookmarked) carries that update under C(then), its fields are part of the C(diff) of the create
+  - C(response) is always the project returned by Sentry. Projects compared with the organization's listing and not written, unchanged or planned in check mode, carry the summary of that listing in C(current) instead, with the C(id), C(slug), C(name), C(platform), C(isBookmarked), C(team) and the slugs of the C(teams) of the project
+  returned: always
+  type: list
+  elements: dict
+summary:
+  description: Number of changed, unchanged and failed projects. In check mode changed counts the planned operations
+  returned: always
+  type: dict
+"""
+
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_bulk import run_concurrently, summarize, DEFAULT_CONCURRENCY
+
+
+def reconcile_project(sentry_api, organization_slug, project, index=None):
+    project_slug = project['project_slug'] or project['slug']
+
+    # a. if state is absent then delete the project, a missing project is already converged
+    if project['state'] == "absent" and index is not None and project_slug not in index:
+        result = dict(
+            changed=False,
+            message="Project is already absent",
+            status_code=404
+        )
+
+    elif project['state'] == "absent":
+        # the prefetched summary spares check mode a retrieve before the planned delete
+        result = sentry_api.delete_project(organization_slug, project_slug, current=index.get(project_slug) if index else None)
+
+        if result['status_code'] == 404:
+            result['changed'] = False
+            result['message'] = "Project is already absent"
+        elif result['status_code'] != 204:
+            result['failed'] = True
+
+    # b. if state is present then update the existing project or create a new one
+    else:
+        # with a prefetched index the existence check and the diff are done from memory
+        if index is None:
+            retrieve_requests = sentry_api.retrieve_project(organization_slug, project_slug)
+        elif project_slug in index:
+            retrieve_requests = dict(status_code=200, response=index[project_slug])
+        else:
+            retrieve_requests = dict(status_code=404)
+
+        if retrieve_requests['status_code'] == 200:
+            result = sentry_api.update_project(
+                organization_slug,
+                project_slug,
+                project['team_slug'],
+                project['name'],
+                project['slug'],
+                project['platform'],
+                project['is_bookmarked'],
+                current=retrieve_requests['response']
+            )
+
+            # without a call Sentry returned nothing, the summary of the listing
+            # isn't a project and goes apart from response
+            if index is not None and result.get('response') is index[project_slug]:
+                result['current'] = result.pop('response')
+
+            if result['status_code'] != 200:
+                result['failed'] = True
+
+        elif retrieve_requests['status_code'] == 404:
+            result = sentry_api.create_project(
+                organization_slug,
+                project['team_slug'],
+                project['name'],
+                project['slug'] or project_slug
+            )
+
+            if result['status_code'] != 201:
+                result['failed'] = True
+
+            # platform and bookmark can't be set on creation, apply them right away
+            elif project['platform'] is not None or project['is_bookmarked'] is not None:
+                follow_up = sentry_api.update_project(
+                    organization_slug,
+                    result['response']['slug'],
+                    None,
+                    None,
+                    None,
+                    project['platform'],
+                    project['is_bookmarked'],
+                    current=result['response']
+                )
+
+                if follow_up['status_code'] != 200:
+                    follow_up['failed'] = True
+                    result['failed'] = True
+
+                sentry_api.follow_up_result(result, follow_up)
+
+        else:
+            result = retrieve_requests
+            result['failed'] = True
+
+    result['project_slug'] = project_slug
+    result['state'] = project['state']
+
+    return result
+
+
+def argument_spec():
+    module_args = dict(
+        sentry_host=dict(type='str', required=False),
+        sentry_token=dict(type='str', required=False, no_log=True),
+        organization_slug=dict(type='str', required=True),
+        projects=dict(
+            type='list',
+            elements='dict',
+            required=True,
+            options=dict(
+                project_slug=dict(type='str', required=False),
+                team_slug=dict(type='str', required=False),
+                name=dict(type='str', required=False),
+                slug=dict(type='str', required=False),
+                platform=dict(type='str', required=False),
+                is_bookmarked=dict(type='bool', required=False),
+                state=dict(
+                    default="present",
+                    choices=['present', 'absent'],
+                    type='str')
+            ),
+            required_one_of=[('project_slug', 'slug')]
+        ),
+        prefetch=dict(type='bool', default=True),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+    module_args.update(sentry_argument_spec())
+
+    return module_args
+
+
+def run_task(sentry_api, params):
+    organization_slug = params['organization_slug']
+    index = None
+
+    if params['prefetch']:
+        index = sentry_api.project_index(organization_slug)
+
+    def worker(project):
+        return reconcile_project(sentry_api, organization_slug, project, index)
+
+    results = run_concurrently(worker, params['projects'], params['concurrency'])
+    summary = summarize(results)
+
+    result = dict(
+        changed=summary['changed'] > 0,
+        results=results,
+        summary=summary
+    )
+
+    if summary['failed']:
+        result['failed'] = True
+        result['msg'] = "Failed to reconcile %d project(s)" % summary['failed']
+
+    return result
+
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
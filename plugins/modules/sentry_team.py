@@ -22,12 +22,14 @@ options:
   sentry_host:
     description:
     - Target hostname of Sentry
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
   sentry_token:
     description:
     - Token which generated in Sentry by administrator. This token is located under "Settings > Internal Integration"
+    - Not needed when the task runs over the C(ridwanbejo.sentry.sentry) httpapi connection
     type: str
     default: true
     version_added: 1.0.0
@@ -61,10 +63,12 @@ options:
     default: 'present'
     choices: [present', 'absent']
     type: str
+extends_documentation_fragment:
+    - ridwanbejo.sentry.sentry
 requirements:
     - "python >= 3.8.10"
     - "ansible >= 2.12.1"
-    - "requests >= 2.26.0"
+    - "requests >= 2.26.0 (only with I(transport=requests))"
 """
 
 EXAMPLES = r"""
@@ -102,14 +106,11 @@ EXAMPLES = r"""
 RETURN = r"""
 """
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApi
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_api import SentryApiError, sentry_argument_spec
+from ansible_collections.ridwanbejo.sentry.plugins.module_utils.sentry_module import run_sentry_module
 
-import requests
-import json
 
-
-def run_module():
+def argument_spec():
     module_args = dict(
         sentry_host=dict(type='str', require=True),
         sentry_token=dict(type='str', require=True),
@@ -123,65 +124,63 @@ def run_module():
             type='str')
     )
 
-    module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True
-    )
+    module_args.update(sentry_argument_spec())
+
+    return module_args
 
-    if module.check_mode:
-        module.exit_json(dict(
-            changed=False,
-            message='Check mode success!'
-        ))
 
+def run_task(sentry_api, params):
     result = dict(
     )
 
-    sentry_api = SentryApi(module, module.params['sentry_host'], module.params['sentry_token'])
-
     # a. if state is present then check the existence of team
-    if module.params['state'] == "present":
+    if params['state'] == "present":
 
         # a.1. if the team is not exist then create new team
         retrieve_requests = sentry_api.retrieve_team(
-            module.params['organization_slug'],
-            module.params['team_slug']
+            params['organization_slug'],
+            params['team_slug']
         )
 
         if retrieve_requests['status_code'] == 200:
             result = sentry_api.update_team(
-                module.params['organization_slug'],
-                module.params['team_slug'],
-                module.params['name'],
-                module.params['slug'],
+                params['organization_slug'],
+                params['team_slug'],
+                params['name'],
+                params['slug'],
+                current=retrieve_requests['response']
             )
 
             if result['status_code'] != 200:
-                module.fail_json(dict(message="Failed update operation", status_code=result['status_code'], detail=result['response']))
+                raise SentryApiError.from_result("Failed update operation", result)
 
         # a.2. if the team is exist before then update the team
         elif retrieve_requests['status_code'] == 404:
 
             result = sentry_api.create_team(
-                module.params['organization_slug'],
-                module.params['name'],
-                module.params['slug']
+                params['organization_slug'],
+                params['name'],
+                params['slug']
             )
 
             if result['status_code'] != 201:
-                module.fail_json(dict(message="Failed create operation", status_code=result['status_code'], detail=result['response']))
+                raise SentryApiError.from_result("Failed create operation", result)
 
     # b. if state is absent then delete the team
-    elif module.params['state'] == "absent":
+    elif params['state'] == "absent":
         result = sentry_api.delete_team(
-            module.params['organization_slug'],
-            module.params['team_slug']
+            params['organization_slug'],
+            params['team_slug']
         )
 
         if result['status_code'] != 204:
-            module.fail_json(dict(message="Failed delete operation", status_code=result['status_code'], detail=result['response']))
+            raise SentryApiError.from_result("Failed delete operation", result)
+
+    return result
 
-    module.exit_json(**result)
+
+def run_module():
+    run_sentry_module(argument_spec(), run_task)
 
 
 def main():